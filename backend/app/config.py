@@ -4,12 +4,64 @@ from typing import List
 
 class Settings(BaseSettings):
     database_url: str
+    database_async: bool = False  # serve the async routes from an asyncpg engine
     jwt_secret_key: str
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 480
     allowed_origins: str = "http://localhost:4200"
     app_env: str = "development"
 
+    # Tracking ingest buffer
+    tracking_queue_size: int = 10000
+    tracking_flush_interval_ms: int = 500
+    tracking_flush_batch_size: int = 500
+    tracking_overflow_policy: str = "drop"  # drop | block
+
+    # Daily tracking rollups
+    rollup_interval_seconds: int = 300
+
+    # Admin result cache
+    cache_ttl_seconds: int = 60
+    cache_max_entries: int = 256
+    principal_cache_ttl_seconds: int = 30
+
+    # Public job board snapshot
+    job_board_max_age_seconds: int = 300
+
+    # CV uploads
+    cv_upload_dir: str = "uploads"
+    cv_max_upload_bytes: int = 10 * 1024 * 1024
+    cv_gc_grace_seconds: int = 3600
+    cv_export_concurrency: int = 4
+
+    # Outbound email delivery (Resend allows 2 requests/second by default)
+    email_rate_per_second: float = 2.0
+    email_concurrency: int = 4
+    email_max_retries: int = 4
+    email_batch_size: int = 100  # recipients per batch API call
+
+    # Newsletter outbox
+    newsletter_batch_size: int = 200
+    newsletter_poll_interval_seconds: float = 5.0
+    newsletter_max_attempts: int = 5
+    newsletter_lease_seconds: int = 600  # how long a claimed batch may take to send before others may retry it
+    newsletter_asset_cache_dir: str = "cache/newsletter_assets"
+    newsletter_asset_cache_bytes: int = 200 * 1024 * 1024
+
+    # Transactional email dispatcher
+    notification_queue_size: int = 1000
+    notification_workers: int = 2
+    notification_timeout_seconds: float = 10.0
+    notification_max_retries: int = 3
+
+    # Password hashing and auth throttling
+    password_hash_workers: int = 2
+    password_hash_max_queue: int = 32
+    auth_rate_window_seconds: int = 300
+    auth_ip_rate_limit: int = 20
+    auth_email_rate_limit: int = 5
+    trusted_proxy_hops: int = 1  # proxies in front of the app that append to X-Forwarded-For
+
     @property
     def origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.allowed_origins.split(",")]
@@ -1,4 +1,7 @@
+import asyncio
+from typing import Union
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import settings
 
@@ -21,3 +24,63 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# ── Async ──────────────────────────────────────────────
+# Only built when DATABASE_ASYNC is on, so asyncpg is needed only then
+async_engine = None
+AsyncSessionLocal = None
+if settings.database_async:
+    async_engine = create_async_engine(
+        settings.database_url.replace("postgresql://", "postgresql+asyncpg://"),
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=20,
+    )
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+class ThreadedSession:
+    """The AsyncSession calls the async routes use, backed by a sync Session on worker threads.
+
+    Stands in for AsyncSession when the async engine is off, so those
+    routes keep the event loop free either way.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    async def execute(self, statement, params=None):
+        return await asyncio.to_thread(self.sync_session.execute, statement, params)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await asyncio.to_thread(fn, self.sync_session, *args, **kwargs)
+
+    async def commit(self):
+        await asyncio.to_thread(self.sync_session.commit)
+
+    async def rollback(self):
+        await asyncio.to_thread(self.sync_session.rollback)
+
+    async def close(self):
+        await asyncio.to_thread(self.sync_session.close)
+
+
+AsyncDB = Union[AsyncSession, ThreadedSession]
+
+
+async def get_async_db():
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    db = ThreadedSession(SessionLocal())
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+async def dispose_async_engine():
+    if async_engine is not None:
+        await async_engine.dispose()
@@ -1,24 +1,39 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
 from app.routes import auth, jobs, applications, analytics, settings, contact, dashboard, newsletter, tracking, reports
-from app.database import engine, Base
+from app.database import dispose_async_engine
+from app.services.tracking_ingest import ingest_buffer
+from app.services.rollups import rollup_worker
+from app.services.query_counter import count_queries
+from app.services.http_client import close_http_client
+from app.services.newsletter_outbox import outbox_worker
+from app.services.notifications import notifications
+from app.services.cloudinary_client import get_uploader
+from app.config import settings as app_settings
+import base64
 import os
 
-Base.metadata.create_all(bind=engine)
+# Importing this module does no I/O; the schema is managed by Alembic
+# (`alembic upgrade head`) and everything else is set up here or on first use.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    os.makedirs(app_settings.cv_upload_dir, exist_ok=True)
+    ingest_buffer.start()
+    rollup_worker.start()
+    outbox_worker.start()
+    notifications.start()
+    yield
+    await notifications.stop()
+    await outbox_worker.stop()
+    await rollup_worker.stop()
+    await ingest_buffer.stop()
+    await close_http_client()
+    await dispose_async_engine()
 
-# Run migrations for new columns
-from sqlalchemy import text
-try:
-    with engine.connect() as conn:
-        conn.execute(text("ALTER TABLE admins ADD COLUMN IF NOT EXISTS reset_token VARCHAR(255)"))
-        conn.execute(text("ALTER TABLE admins ADD COLUMN IF NOT EXISTS reset_token_expiry TIMESTAMP"))
-        conn.commit()
-except Exception as e:
-    print(f"Migration warning: {e}")
-
-app = FastAPI(title="Luton Friendship Homecarers API")
+app = FastAPI(title="Luton Friendship Homecarers API", lifespan=lifespan)
 
 # CORS Configuration
 app.add_middleware(
@@ -32,12 +47,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Cache", "X-Cache-Age"],
 )
 
-uploads_dir = "uploads"
-if not os.path.exists(uploads_dir):
-    os.makedirs(uploads_dir)
-app.mount("/uploads", StaticFiles(directory=uploads_dir), name="uploads")
+if app_settings.app_env == "development":
+    @app.middleware("http")
+    async def query_count_header(request, call_next):
+        with count_queries() as queries:
+            response = await call_next(request)
+        response.headers["X-Query-Count"] = str(queries.count)
+        return response
+
+# The directory is created in lifespan, before the first request
+app.mount("/uploads", StaticFiles(directory=app_settings.cv_upload_dir, check_dir=False), name="uploads")
 
 app.include_router(auth.router)
 app.include_router(jobs.router)
@@ -56,17 +78,9 @@ def root():
 
 @app.get("/api/debug-cloudinary")
 def debug_cloudinary():
-    import os, cloudinary, cloudinary.uploader
-    secret = os.getenv("CLOUDINARY_API_SECRET", "NOT SET")
-    cloudinary.config(
-        cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-        api_key=os.getenv("CLOUDINARY_API_KEY"),
-        api_secret=secret
-    )
     try:
-        import base64
         img_bytes = base64.b64decode("iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg==")
-        result = cloudinary.uploader.upload(
+        result = get_uploader().upload(
             img_bytes,
             public_id="test_upload",
             resource_type="image"
@@ -1,7 +1,7 @@
 from datetime import datetime
 from sqlalchemy import (
-    Column, Integer, String, Text, Boolean, DateTime,
-    ForeignKey, Enum as SAEnum, Float
+    Column, Integer, BigInteger, String, Text, Boolean, Date, DateTime,
+    ForeignKey, Enum as SAEnum, Float, LargeBinary, Index
 )
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -61,6 +61,11 @@ APPLICATION_STATUSES = ("New", "Reviewed", "Interview", "Hired", "Rejected")
 
 class Application(Base):
     __tablename__ = "applications"
+    __table_args__ = (
+        Index("ix_applications_applied_at_id", "applied_at", "id"),
+        Index("ix_applications_status_applied_at_id", "status", "applied_at", "id"),
+        Index("ix_applications_job_id_applied_at_id", "job_id", "applied_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -146,7 +151,11 @@ class SystemSetting(Base):
 
 class ContactInquiry(Base):
     __tablename__ = "contact_inquiries"
-    
+    __table_args__ = (
+        Index("ix_contact_inquiries_created_at_id", "created_at", "id"),
+        Index("ix_contact_inquiries_status_created_at_id", "status", "created_at", "id"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     email = Column(String, nullable=False)
@@ -157,3 +166,72 @@ class ContactInquiry(Base):
     admin_reply = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     replied_at = Column(DateTime, nullable=True)
+
+
+class VisitDailyRollup(Base):
+    __tablename__ = "visit_daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    source = Column(String(100), primary_key=True)
+    device = Column(String(50), primary_key=True)
+    visits = Column(Integer, nullable=False, default=0)
+    bounces = Column(Integer, nullable=False, default=0)
+    duration_sum = Column(BigInteger, nullable=False, default=0)
+    duration_count = Column(Integer, nullable=False, default=0)
+
+
+class PageDailyRollup(Base):
+    __tablename__ = "page_daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    page = Column(String(500), primary_key=True)
+    views = Column(Integer, nullable=False, default=0)
+    unique_sessions = Column(Integer, nullable=False, default=0)
+    bounces = Column(Integer, nullable=False, default=0)
+    duration_sum = Column(BigInteger, nullable=False, default=0)
+    sessions_hll = Column(LargeBinary, nullable=True)
+
+
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(100), primary_key=True)
+    rolled_until = Column(Date, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class NewsletterCampaign(Base):
+    __tablename__ = "newsletter_campaigns"
+
+    id = Column(Integer, primary_key=True, index=True)
+    subject = Column(String(255), nullable=False)
+    message = Column(Text, nullable=False)
+    html = Column(Text, nullable=False)
+    attachments = Column(Text, nullable=True)  # JSON list of {filename, content} sent with every email
+    attachment_info = Column(Text, nullable=True)  # JSON list of {name, url} copied to newsletter_history
+    status = Column(String(20), nullable=False, default="sending")  # sending, completed
+    total = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+
+    deliveries = relationship("NewsletterDelivery", back_populates="campaign", cascade="all, delete-orphan")
+
+
+class NewsletterDelivery(Base):
+    __tablename__ = "newsletter_deliveries"
+    __table_args__ = (
+        Index("ix_newsletter_deliveries_status_next_attempt_at_id", "status", "next_attempt_at", "id"),
+        Index("ix_newsletter_deliveries_campaign_id_status", "campaign_id", "status"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    campaign_id = Column(Integer, ForeignKey("newsletter_campaigns.id", ondelete="CASCADE"), nullable=False)
+    email = Column(String(255), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending, retrying, sending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String(500), nullable=True)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    campaign = relationship("NewsletterCampaign", back_populates="deliveries")
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from datetime import datetime, timedelta
 from app.database import get_db
-from app.models import Admin, Job, Application
-from app.services.auth_service import get_current_admin
+from app.models import Job, Application
+from app.services.auth_service import AdminPrincipal, get_current_admin
+from app.services.analytics_queries import visit_metrics, page_view_metrics
+from app.services.rollups import rollup_watermark
+from app.services.cache import cached, ANALYTICS, ANALYTICS_DASHBOARD
+from app.services.application_queries import recent_applications as recent_application_rows
 
 router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
 
@@ -24,56 +28,37 @@ def get_date_range(period: str):
     return now - timedelta(days=7)  # default week
 
 @router.get("")
+@cached(ANALYTICS, key_params=("period", "exact"))
 def get_analytics(
+    response: Response,
     period: str = 'week',
-    current_admin: Admin = Depends(get_current_admin),
+    exact: bool = False,
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     since = get_date_range(period)
 
-    # Visitors and page views
-    total_visitors = db.execute(text("SELECT COUNT(*) FROM site_visits WHERE visited_at >= :s"), {"s": since}).scalar() or 0
-    total_pageviews = db.execute(text("SELECT COUNT(*) FROM page_views WHERE viewed_at >= :s"), {"s": since}).scalar() or 0
+    # exact=true skips the rollups and sketches and scans raw rows
+    watermark = None if exact else rollup_watermark(db)
+    visits = visit_metrics(db, since, watermark)
+    views = page_view_metrics(db, since, watermark, unique_pages=5, exact=exact)
+    total_visitors = visits.visitors
+    total_pageviews = views.page_views
     total_applications = db.execute(text("SELECT COUNT(*) FROM applications")).scalar() or 0
 
     # Conversion rate
     conversion_rate = round((total_applications / total_visitors * 100), 1) if total_visitors > 0 else 0.0
 
     # Avg duration
-    avg_dur = db.execute(text(
-        "SELECT AVG(duration_seconds) FROM site_visits WHERE visited_at >= :s AND duration_seconds > 0"
-    ), {"s": since}).scalar() or 0
+    avg_dur = visits.avg_duration
 
     # Bounce rate
-    total_v = db.execute(text("SELECT COUNT(*) FROM site_visits WHERE visited_at >= :s"), {"s": since}).scalar() or 0
-    bounced_v = db.execute(text("SELECT COUNT(*) FROM site_visits WHERE visited_at >= :s AND bounced = TRUE"), {"s": since}).scalar() or 0
-    bounce_rate = round((bounced_v / total_v * 100), 1) if total_v > 0 else 0.0
+    bounce_rate = round((visits.bounced / total_visitors * 100), 1) if total_visitors > 0 else 0.0
 
-    # Daily views for chart (last 7 days)
-    daily = db.execute(text("""
-        SELECT DATE(viewed_at) as day, COUNT(*) as views
-        FROM page_views WHERE viewed_at >= :s
-        GROUP BY DATE(viewed_at) ORDER BY day
-    """), {"s": since}).fetchall()
-
-    # Traffic sources
-    sources = db.execute(text("""
-        SELECT referrer, COUNT(*) as count FROM site_visits
-        WHERE visited_at >= :s GROUP BY referrer ORDER BY count DESC
-    """), {"s": since}).fetchall()
-
-    # Devices
-    devices = db.execute(text("""
-        SELECT device, COUNT(*) as count FROM site_visits
-        WHERE visited_at >= :s GROUP BY device ORDER BY count DESC
-    """), {"s": since}).fetchall()
-
-    # Top pages
-    top_pages = db.execute(text("""
-        SELECT page, COUNT(*) as views, COUNT(DISTINCT session_id) as unique_visitors
-        FROM page_views WHERE viewed_at >= :s
-        GROUP BY page ORDER BY views DESC LIMIT 5
-    """), {"s": since}).fetchall()
+    daily = views.daily
+    sources = visits.sources
+    devices = visits.devices
+    top_pages = views.top_pages(5)
 
     # Popular jobs
     jobs = db.execute(text("""
@@ -102,23 +87,24 @@ def get_analytics(
     }
 
 @router.get("/dashboard")
+@cached(ANALYTICS_DASHBOARD)
 def get_dashboard_data(
-    current_admin: Admin = Depends(get_current_admin),
+    response: Response,
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     total_jobs = db.query(Job).filter(Job.is_active == True).count()
     total_applications = db.query(Application).count()
     new_applications = db.query(Application).filter(Application.status == "New").count()
-    recent_apps = db.query(Application).order_by(Application.applied_at.desc()).limit(5).all()
     recent_applications = [
         {
             "id": app.id,
             "name": app.name,
-            "position": app.job.title if app.job else "Unknown",
+            "position": app.position,
             "date": app.applied_at.isoformat(),
             "status": app.status
         }
-        for app in recent_apps
+        for app in recent_application_rows(db, 5)
     ]
     return {
         "stats": {
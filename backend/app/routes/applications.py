@@ -1,20 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models import Admin, Job, Application, NotificationPreference
-from app.services.auth_service import get_current_admin
+from app.services.auth_service import AdminPrincipal, get_current_admin
 from app.schemas import ApplicationResponse, ApplicationStatusUpdate
-from typing import Optional
-import os
-import uuid
-import cloudinary
-import cloudinary.uploader
-
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET")
-)
+from app.services.cache import invalidate_application_results
+from app.services.job_board import job_board
+from app.services.application_queries import application_list, application_cvs
+from app.services.pagination import keyset_order, keyset_page, set_page_headers, MAX_PAGE_SIZE
+from app.services.uploads import save_cv
+from app.services.cv_files import cv_response
+from app.services.cv_store import release_cvs, collect_garbage
+from app.services.cv_export import archive_names, stream_cv_zip
+from app.services.exports import ExportFormat, export_response
+from app.services.notifications import notifications
+from app.config import settings
+from typing import Optional, Literal
+from datetime import datetime
+import asyncio
 
 router = APIRouter(prefix="/api/applications", tags=["Applications"])
 
@@ -23,112 +27,101 @@ VALID_STATUSES = ("New", "Reviewed", "Interview", "Hired", "Rejected")
 
 @router.get("", response_model=list[ApplicationResponse])
 def get_applications(
-    current_admin: Admin = Depends(get_current_admin),
+    response: Response,
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
     status_filter: str = None,
     job_id: int = None,
+    applied_from: Optional[datetime] = None,
+    applied_to: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order: Literal["desc", "asc"] = "desc",
+    include_total: bool = True,
 ):
-    query = db.query(Application).order_by(Application.applied_at.desc())
-    if status_filter:
-        query = query.filter(Application.status == status_filter)
-    if job_id:
-        query = query.filter(Application.job_id == job_id)
-    applications = query.all()
-    return [
-        ApplicationResponse(
-            id=app.id,
-            job_id=app.job_id,
-            position=app.job.title if app.job else "Unknown",
-            name=app.name,
-            email=app.email,
-            phone=app.phone,
-            experience=app.experience,
-            availability=app.availability,
-            cv_url=app.cv_url,
-            status=app.status,
-            applied_at=app.applied_at,
-            updated_at=app.updated_at,
+    query = application_list(
+        db, status=status_filter, job_id=job_id, applied_from=applied_from, applied_to=applied_to
+    )
+    page = keyset_page(
+        query, Application.applied_at, Application.id,
+        limit=limit, cursor=cursor, descending=order == "desc", include_total=include_total,
+    )
+    set_page_headers(response, page)
+    return [ApplicationResponse(**row._mapping) for row in page.rows]
+
+
+@router.get("/export")
+def export_applications(
+    current_admin: AdminPrincipal = Depends(get_current_admin),
+    status_filter: str = None,
+    job_id: int = None,
+    applied_from: Optional[datetime] = None,
+    applied_to: Optional[datetime] = None,
+    order: Literal["desc", "asc"] = "desc",
+    format: ExportFormat = "csv",
+):
+    def build_query(db: Session):
+        query = application_list(
+            db, status=status_filter, job_id=job_id, applied_from=applied_from, applied_to=applied_to
         )
-        for app in applications
-    ]
+        return keyset_order(query, Application.applied_at, Application.id, descending=order == "desc")
+
+    return export_response(build_query, format, "applications")
 
 
 @router.get("/cv/download")
 async def download_cv(
+    request: Request,
     url: str,
     filename: str = "CV",
-    current_admin: Admin = Depends(get_current_admin)
+    current_admin: AdminPrincipal = Depends(get_current_admin)
 ):
-    import httpx
-    from fastapi.responses import StreamingResponse, FileResponse
-    # Handle local files
-    if url.startswith("/uploads/"):
-        local_path = url.lstrip("/")
-        if not os.path.exists(local_path):
-            raise HTTPException(status_code=404, detail="File not found")
-        if ".pdf" in url.lower():
-            media_type = "application/pdf"
-            ext = ".pdf"
-        elif ".docx" in url.lower():
-            media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            ext = ".docx"
-        else:
-            media_type = "application/msword"
-            ext = ".doc"
-        return FileResponse(local_path, media_type=media_type, filename=f"{filename}_CV{ext}")
-    # Handle Cloudinary URLs
-    async with httpx.AsyncClient(follow_redirects=True) as client:
-        response = await client.get(url)
-    print(f"Cloudinary response status: {response.status_code}, content-type: {response.headers.get('content-type')}, size: {len(response.content)}")
-    if ".pdf" in url.lower():
-        ext = ".pdf"
-        media_type = "application/pdf"
-    elif ".docx" in url.lower():
-        ext = ".docx"
-        media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-    elif ".doc" in url.lower():
-        ext = ".doc"
-        media_type = "application/msword"
-    else:
-        ext = ".pdf"
-        media_type = "application/pdf"
+    return await cv_response(request, url, filename)
+
+
+@router.get("/cv/export")
+async def export_cvs(
+    job_id: Optional[int] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+):
+    rows = await asyncio.to_thread(application_cvs, db, status_filter, job_id)
+    if not rows:
+        raise HTTPException(status_code=404, detail="No CVs match these filters")
+    filename = f"CVs_job_{job_id}.zip" if job_id else "CVs.zip"
     return StreamingResponse(
-        iter([response.content]),
-        media_type=media_type,
-        headers={"Content-Disposition": f'attachment; filename="{filename}_CV{ext}"'}
+        stream_cv_zip(archive_names(rows), settings.cv_export_concurrency),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
 
 
+@router.post("/cv/gc")
+def sweep_cv_store(
+    current_admin: AdminPrincipal = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+):
+    return collect_garbage(db)
+
+
 @router.get("/{application_id}", response_model=ApplicationResponse)
 def get_application(
     application_id: int,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
-    app = db.query(Application).filter(Application.id == application_id).first()
-    if not app:
+    row = application_list(db).filter(Application.id == application_id).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Application not found")
-    return ApplicationResponse(
-        id=app.id,
-        job_id=app.job_id,
-        position=app.job.title if app.job else "Unknown",
-        name=app.name,
-        email=app.email,
-        phone=app.phone,
-        experience=app.experience,
-        availability=app.availability,
-        cv_url=app.cv_url,
-        status=app.status,
-        applied_at=app.applied_at,
-        updated_at=app.updated_at,
-    )
+    return ApplicationResponse(**row._mapping)
 
 
 @router.patch("/{application_id}/status")
 def update_application_status(
     application_id: int,
     status_update: ApplicationStatusUpdate,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     if status_update.status not in VALID_STATUSES:
@@ -138,20 +131,26 @@ def update_application_status(
         raise HTTPException(status_code=404, detail="Application not found")
     app.status = status_update.status
     db.commit()
+    invalidate_application_results()
+    job_board.invalidate()
     return {"message": "Status updated successfully"}
 
 
 @router.delete("/{application_id}")
 def delete_application(
     application_id: int,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     app = db.query(Application).filter(Application.id == application_id).first()
     if not app:
         raise HTTPException(status_code=404, detail="Application not found")
+    cv_url = app.cv_url
     db.delete(app)
     db.commit()
+    release_cvs(db, [cv_url])
+    invalidate_application_results()
+    job_board.invalidate()
     return {"message": "Application deleted successfully"}
 
 
@@ -172,20 +171,9 @@ async def submit_application(
 
     cv_url = None
     if cv and cv.filename:
-        allowed_extensions = ['.pdf', '.doc', '.docx']
-        file_ext = os.path.splitext(cv.filename)[1].lower() or '.pdf'
-        if file_ext not in allowed_extensions:
-            raise HTTPException(status_code=400, detail="Only PDF, DOC, and DOCX files are allowed")
         try:
-            file_content = await cv.read()
-            if len(file_content) == 0:
-                raise HTTPException(status_code=400, detail="Uploaded file is empty")
-            # Save directly to uploads folder
-            unique_filename = f"{uuid.uuid4()}{file_ext}"
-            upload_path = f"uploads/{unique_filename}"
-            with open(upload_path, "wb") as f:
-                f.write(file_content)
-            cv_url = f"/uploads/{unique_filename}"
+            saved = await save_cv(cv, settings.cv_upload_dir, settings.cv_max_upload_bytes)
+            cv_url = f"/uploads/{saved.relpath}"
         except HTTPException:
             raise
         except Exception as e:
@@ -205,25 +193,19 @@ async def submit_application(
     db.add(new_application)
     db.commit()
     db.refresh(new_application)
+    invalidate_application_results()
+    job_board.invalidate()
 
     try:
-        import httpx
         admin = db.query(Admin).first()
         if admin:
             prefs = db.query(NotificationPreference).filter(NotificationPreference.admin_id == admin.id).first()
             if not prefs or prefs.email_new_application:
-                resend_api_key = os.getenv("RESEND_API_KEY")
-                if resend_api_key:
-                    httpx.post(
-                        "https://api.resend.com/emails",
-                        headers={"Authorization": f"Bearer {resend_api_key}", "Content-Type": "application/json"},
-                        json={
-                            "from": "onboarding@resend.dev",
-                            "to": [admin.email],
-                            "subject": f"New Job Application: {name}",
-                            "html": f"<h2>New Job Application</h2><p><strong>Name:</strong> {name}</p><p><strong>Email:</strong> {email}</p><p><strong>Phone:</strong> {phone}</p>"
-                        }
-                    )
+                notifications.send(
+                    admin.email,
+                    f"New Job Application: {name}",
+                    f"<h2>New Job Application</h2><p><strong>Name:</strong> {name}</p><p><strong>Email:</strong> {email}</p><p><strong>Phone:</strong> {phone}</p>"
+                )
     except Exception:
         pass
 
@@ -1,26 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models import Admin
 from app.schemas import LoginRequest, LoginResponse, AdminProfileResponse
 from app.services.auth_service import (
-    verify_password,
+    AdminPrincipal,
     create_access_token,
     get_current_admin,
+    invalidate_principal,
 )
+from app.services.password_hashing import hash_executor, verify_password_async, hash_password_async
+from app.services.rate_limit import SlidingWindowLimiter, enforce
+from app.config import settings
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
+# Checked before any bcrypt work so a flood of guesses cannot tie up the hash pool
+ip_limiter = SlidingWindowLimiter(settings.auth_ip_rate_limit, settings.auth_rate_window_seconds)
+email_limiter = SlidingWindowLimiter(settings.auth_email_rate_limit, settings.auth_rate_window_seconds)
+
+
+def client_ip(request: Request) -> str:
+    """The caller's address as seen by the outermost of ``trusted_proxy_hops`` proxies.
+
+    Each proxy appends the peer it saw to X-Forwarded-For, so the entry that
+    many places from the end is the first one a client cannot forge.
+    """
+    hops = settings.trusted_proxy_hops
+    forwarded = [h.strip() for h in request.headers.get("x-forwarded-for", "").split(",") if h.strip()]
+    if hops and len(forwarded) >= hops:
+        return forwarded[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+def _admin_by(db: Session, *criteria):
+    return db.query(Admin).filter(*criteria).first()
+
+
+def _set_password(db: Session, admin: Admin, password_hash: str, clear_reset_token: bool = False):
+    admin.password_hash = password_hash
+    if clear_reset_token:
+        admin.reset_token = None
+        admin.reset_token_expiry = None
+    db.commit()
+
 
 @router.post("/login", response_model=LoginResponse)
-def login(credentials: LoginRequest, db: Session = Depends(get_db)):
-    logger.info(f"Login attempt for email: {credentials.email}")
-    
-    admin = db.query(Admin).filter(Admin.email == credentials.email).first()
+async def login(credentials: LoginRequest, request: Request, db: Session = Depends(get_db)):
+    enforce(
+        (ip_limiter, f"login:{client_ip(request)}"),
+        (email_limiter, f"login:{credentials.email.lower()}"),
+    )
+
+    admin = await asyncio.to_thread(_admin_by, db, Admin.email == credentials.email)
     
     if not admin:
         logger.warning(f"Admin not found for email: {credentials.email}")
@@ -29,13 +66,7 @@ def login(credentials: LoginRequest, db: Session = Depends(get_db)):
             detail="Invalid email or password",
         )
     
-    logger.info(f"Admin found: {admin.email}, is_active: {admin.is_active}")
-    logger.info(f"Password hash from DB (first 20 chars): {admin.password_hash[:20]}")
-    
-    password_valid = verify_password(credentials.password, admin.password_hash)
-    logger.info(f"Password verification result: {password_valid}")
-    
-    if not password_valid:
+    if not await verify_password_async(credentials.password, admin.password_hash):
         logger.warning("Password verification failed")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -56,6 +87,7 @@ def login(credentials: LoginRequest, db: Session = Depends(get_db)):
     }
     access_token = create_access_token(data=token_payload)
 
+    email_limiter.reset(f"login:{credentials.email.lower()}")
     logger.info(f"Login successful for {admin.email}")
     return LoginResponse(
         access_token=access_token,
@@ -70,36 +102,49 @@ def logout():
     return {"message": "Logged out successfully"}
 
 
+@router.get("/hash-stats")
+def password_hash_stats(current_admin: AdminPrincipal = Depends(get_current_admin)):
+    return hash_executor.stats()
+
+
 @router.get("/me", response_model=AdminProfileResponse)
-def get_me(current_admin: Admin = Depends(get_current_admin)):
+def get_me(current_admin: AdminPrincipal = Depends(get_current_admin)):
     return current_admin
 
 @router.patch("/profile")
 def update_profile(
     data: dict,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
+    admin = db.get(Admin, current_admin.id)
     if "full_name" in data:
-        current_admin.name = data["full_name"]
+        admin.name = data["full_name"]
     if "email" in data:
-        current_admin.email = data["email"]
+        admin.email = data["email"]
     if "phone" in data:
-        current_admin.phone = data.get("phone")
+        admin.phone = data.get("phone")
     db.commit()
+    invalidate_principal(admin.id)
     return {"message": "Profile updated successfully"}
 
 @router.post("/change-password")
-def change_password(
+async def change_password(
     data: dict,
-    current_admin: Admin = Depends(get_current_admin),
+    request: Request,
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
-    from app.services.auth_service import verify_password, get_password_hash
-    if not verify_password(data["current_password"], current_admin.password_hash):
+    enforce(
+        (ip_limiter, f"change-password:{client_ip(request)}"),
+        (email_limiter, f"change-password:{current_admin.email.lower()}"),
+    )
+    admin = await asyncio.to_thread(db.get, Admin, current_admin.id)
+    if not await verify_password_async(data["current_password"], admin.password_hash):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
-    current_admin.password_hash = get_password_hash(data["new_password"])
-    db.commit()
+    password_hash = await hash_password_async(data["new_password"])
+    await asyncio.to_thread(_set_password, db, admin, password_hash)
+    invalidate_principal(admin.id)
     return {"message": "Password changed successfully"}
 
 
@@ -116,8 +161,12 @@ class ResetPasswordRequest(BaseModel):
     new_password: str
 
 @router.post("/forgot-password")
-def forgot_password(data: ForgotPasswordRequest, db: Session = Depends(get_db)):
+def forgot_password(data: ForgotPasswordRequest, request: Request, db: Session = Depends(get_db)):
     from app.routes.reports import send_email
+    enforce(
+        (ip_limiter, f"forgot-password:{client_ip(request)}"),
+        (email_limiter, f"forgot-password:{data.email.lower()}"),
+    )
     admin = db.query(Admin).filter(Admin.email == data.email).first()
     if not admin:
         raise HTTPException(status_code=404, detail="No account found with that email address")
@@ -139,16 +188,14 @@ def forgot_password(data: ForgotPasswordRequest, db: Session = Depends(get_db)):
     return {"message": "If that email exists, a reset link has been sent"}
 
 @router.post("/reset-password")
-def reset_password(data: ResetPasswordRequest, db: Session = Depends(get_db)):
-    from app.services.auth_service import get_password_hash
-    admin = db.query(Admin).filter(Admin.reset_token == data.token).first()
+async def reset_password(data: ResetPasswordRequest, db: Session = Depends(get_db)):
+    admin = await asyncio.to_thread(_admin_by, db, Admin.reset_token == data.token)
     if not admin:
         raise HTTPException(status_code=400, detail="Invalid or expired token")
     if admin.reset_token_expiry < datetime.utcnow():
         raise HTTPException(status_code=400, detail="Token has expired")
     
-    admin.password_hash = get_password_hash(data.new_password)
-    admin.reset_token = None
-    admin.reset_token_expiry = None
-    db.commit()
+    password_hash = await hash_password_async(data.new_password)
+    await asyncio.to_thread(_set_password, db, admin, password_hash, True)
+    invalidate_principal(admin.id)
     return {"message": "Password reset successfully"}
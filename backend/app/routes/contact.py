@@ -1,13 +1,14 @@
-import os
-import httpx
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from datetime import datetime
 from app.database import get_db
-from app.models import Admin, ContactInquiry
-from app.services.auth_service import get_current_admin
+from app.models import ContactInquiry
+from app.services.auth_service import AdminPrincipal, get_current_admin
+from app.services.pagination import keyset_order, keyset_page, set_page_headers, MAX_PAGE_SIZE
+from app.services.exports import ExportFormat, export_response
+from app.services.notifications import notifications
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Optional, Literal
 
 router = APIRouter(prefix="/api/contact", tags=["Contact"])
 
@@ -54,12 +55,49 @@ def submit_inquiry(
     return {"message": "Thank you for contacting us! We'll get back to you soon."}
 
 # ── Admin Routes ───────────────────────────────────
+EXPORT_COLUMNS = (
+    ContactInquiry.id,
+    ContactInquiry.name,
+    ContactInquiry.email,
+    ContactInquiry.phone,
+    ContactInquiry.subject,
+    ContactInquiry.message,
+    ContactInquiry.status,
+    ContactInquiry.admin_reply,
+    ContactInquiry.created_at,
+    ContactInquiry.replied_at,
+)
+
+
+def _filter_inquiries(query, status_filter, created_from, created_to):
+    if status_filter:
+        query = query.filter(ContactInquiry.status == status_filter)
+    if created_from:
+        query = query.filter(ContactInquiry.created_at >= created_from)
+    if created_to:
+        query = query.filter(ContactInquiry.created_at < created_to)
+    return query
+
 @router.get("", response_model=list[ContactInquiryResponse])
 def get_inquiries(
-    current_admin: Admin = Depends(get_current_admin),
+    response: Response,
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
+    status_filter: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order: Literal["desc", "asc"] = "desc",
+    include_total: bool = True,
 ):
-    inquiries = db.query(ContactInquiry).order_by(ContactInquiry.created_at.desc()).all()
+    query = _filter_inquiries(db.query(ContactInquiry), status_filter, created_from, created_to)
+    page = keyset_page(
+        query, ContactInquiry.created_at, ContactInquiry.id,
+        limit=limit, cursor=cursor, descending=order == "desc", include_total=include_total,
+    )
+    set_page_headers(response, page)
+    inquiries = page.rows
     return [
         ContactInquiryResponse(
             id=inq.id,
@@ -77,11 +115,26 @@ def get_inquiries(
         for inq in inquiries
     ]
 
+@router.get("/export")
+def export_inquiries(
+    current_admin: AdminPrincipal = Depends(get_current_admin),
+    status_filter: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    order: Literal["desc", "asc"] = "desc",
+    format: ExportFormat = "csv",
+):
+    def build_query(db: Session):
+        query = _filter_inquiries(db.query(*EXPORT_COLUMNS), status_filter, created_from, created_to)
+        return keyset_order(query, ContactInquiry.created_at, ContactInquiry.id, descending=order == "desc")
+
+    return export_response(build_query, format, "inquiries")
+
 @router.patch("/{inquiry_id}/reply")
 def reply_to_inquiry(
     inquiry_id: int,
     reply_data: dict,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     inquiry = db.query(ContactInquiry).filter(ContactInquiry.id == inquiry_id).first()
@@ -96,36 +149,27 @@ def reply_to_inquiry(
 
     # Send email via Resend
     try:
-        resend_api_key = os.getenv("RESEND_API_KEY")
-        if resend_api_key:
-            import httpx as _httpx
-            _httpx.post(
-                "https://api.resend.com/emails",
-                headers={"Authorization": f"Bearer {resend_api_key}", "Content-Type": "application/json"},
-                json={
-                    "from": "onboarding@resend.dev",
-                    "to": [inquiry.email],
-                    "subject": f"Re: {inquiry.subject or 'Your Inquiry'} - Luton Friendship Homecarers",
-                    "html": f"""
-                        <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-                            <div style="background: #2563EB; padding: 24px; border-radius: 8px 8px 0 0;">
-                                <h2 style="color: white; margin: 0;">Luton Friendship Homecarers</h2>
-                            </div>
-                            <div style="padding: 24px; border: 1px solid #e2e8f0; border-top: none; border-radius: 0 0 8px 8px;">
-                                <p>Dear {inquiry.name},</p>
-                                <p>Thank you for contacting us. Here is our response to your inquiry:</p>
-                                <div style="background: #f8fafc; padding: 16px; border-left: 4px solid #2563EB; border-radius: 4px; margin: 16px 0;">
-                                    {reply_text}
-                                </div>
-                                <p style="color: #64748b; font-size: 0.875rem;">Your original message: <em>{inquiry.message}</em></p>
-                                <hr style="border: none; border-top: 1px solid #e2e8f0; margin: 24px 0;">
-                                <p style="color: #64748b; font-size: 0.8rem;">Luton Friendship Homecarers | info@lutonfhc.org.uk</p>
-                            </div>
+        notifications.send(
+            inquiry.email,
+            f"Re: {inquiry.subject or 'Your Inquiry'} - Luton Friendship Homecarers",
+            f"""
+                <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+                    <div style="background: #2563EB; padding: 24px; border-radius: 8px 8px 0 0;">
+                        <h2 style="color: white; margin: 0;">Luton Friendship Homecarers</h2>
+                    </div>
+                    <div style="padding: 24px; border: 1px solid #e2e8f0; border-top: none; border-radius: 0 0 8px 8px;">
+                        <p>Dear {inquiry.name},</p>
+                        <p>Thank you for contacting us. Here is our response to your inquiry:</p>
+                        <div style="background: #f8fafc; padding: 16px; border-left: 4px solid #2563EB; border-radius: 4px; margin: 16px 0;">
+                            {reply_text}
                         </div>
-                    """
-                },
-                timeout=10
-            )
+                        <p style="color: #64748b; font-size: 0.875rem;">Your original message: <em>{inquiry.message}</em></p>
+                        <hr style="border: none; border-top: 1px solid #e2e8f0; margin: 24px 0;">
+                        <p style="color: #64748b; font-size: 0.8rem;">Luton Friendship Homecarers | info@lutonfhc.org.uk</p>
+                    </div>
+                </div>
+            """
+        )
     except Exception as e:
         print(f"Email send error: {e}")
 
@@ -134,7 +178,7 @@ def reply_to_inquiry(
 @router.delete("/{inquiry_id}")
 def delete_inquiry(
     inquiry_id: int,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     inquiry = db.query(ContactInquiry).filter(ContactInquiry.id == inquiry_id).first()
@@ -148,7 +192,7 @@ def delete_inquiry(
 @router.patch("/{inquiry_id}/read")
 def mark_as_read(
     inquiry_id: int,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     inquiry = db.query(ContactInquiry).filter(ContactInquiry.id == inquiry_id).first()
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from app.database import get_db
-from app.models import Admin, Job, Application, AnalyticsSnapshot
-from app.services.auth_service import get_current_admin
+from app.models import Job, Application, AnalyticsSnapshot
+from app.services.auth_service import AdminPrincipal, get_current_admin
+from app.services.cache import cached, DASHBOARD
+from app.services.application_queries import recent_applications as recent_application_rows
 from app.schemas import (
     DashboardResponse,
     DashboardStatsResponse,
@@ -33,8 +35,10 @@ def _relative_time(dt: datetime) -> str:
 
 
 @router.get("", response_model=DashboardResponse)
+@cached(DASHBOARD)
 def get_dashboard(
-    current_admin: Admin = Depends(get_current_admin),
+    response: Response,
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     total_applications = db.query(Application).count()
@@ -56,21 +60,15 @@ def get_dashboard(
         total_page_views=total_page_views,
     )
 
-    recent_apps = (
-        db.query(Application)
-        .order_by(Application.applied_at.desc())
-        .limit(4)
-        .all()
-    )
     recent_applications = [
         RecentApplicationResponse(
             id=app.id,
             name=app.name,
-            position=app.job.title if app.job else "Unknown",
+            position=app.position,
             date=_relative_time(app.applied_at),
             status=app.status,
         )
-        for app in recent_apps
+        for app in recent_application_rows(db, 4)
     ]
 
     if recent_snapshots:
@@ -1,45 +1,51 @@
+import asyncio
 import json
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models import Admin, Application, Job
-from app.services.auth_service import get_current_admin
+from app.models import Application, Job
+from app.services.auth_service import AdminPrincipal, get_current_admin
 from app.schemas import JobCreate, JobUpdate, JobResponse
+from app.services.cache import invalidate_job_results
+from app.services.job_queries import jobs_with_applicant_counts, applicant_count
+from app.services.job_board import job_board, snapshot_response
+from app.services.cv_store import release_cvs
 
 router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
 
-def job_to_response(job: Job) -> JobResponse:
-    return JobResponse.from_orm_job(job)
+def job_to_response(job: Job, applicants: int = 0) -> JobResponse:
+    return JobResponse.from_orm_job(job, applicants)
 
 @router.get("/public/active", response_model=list[JobResponse])
-def get_public_jobs(db: Session = Depends(get_db)):
-    jobs = db.query(Job).filter(Job.is_active == True).order_by(Job.created_at.desc()).all()
-    return [job_to_response(j) for j in jobs]
+async def get_public_jobs(request: Request):
+    # Served from the in-memory snapshot; only a cold or expired snapshot reads the database
+    snapshot = job_board.current() or await asyncio.to_thread(job_board.load)
+    return snapshot_response(request, snapshot)
 
 @router.get("", response_model=list[JobResponse])
 def get_jobs(
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
-    jobs = db.query(Job).order_by(Job.created_at.desc()).all()
-    return [job_to_response(j) for j in jobs]
+    rows = jobs_with_applicant_counts(db).order_by(Job.created_at.desc()).all()
+    return [job_to_response(job, applicants) for job, applicants in rows]
 
 @router.get("/{job_id}", response_model=JobResponse)
 def get_job(
     job_id: int,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     job = db.query(Job).filter(Job.id == job_id).first()
     if not job:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
-    return job_to_response(job)
+    return job_to_response(job, applicant_count(db, job.id))
 
 @router.post("", response_model=JobResponse, status_code=status.HTTP_201_CREATED)
 def create_job(
     job_data: JobCreate,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     job = Job(
@@ -66,13 +72,15 @@ def create_job(
     db.add(job)
     db.commit()
     db.refresh(job)
+    invalidate_job_results()
+    job_board.rebuild(db)
     return job_to_response(job)
 
 @router.put("/{job_id}", response_model=JobResponse)
 def update_job(
     job_id: int,
     job_data: JobUpdate,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     job = db.query(Job).filter(Job.id == job_id).first()
@@ -94,29 +102,36 @@ def update_job(
 
     db.commit()
     db.refresh(job)
-    return job_to_response(job)
+    invalidate_job_results()
+    job_board.rebuild(db)
+    return job_to_response(job, applicant_count(db, job.id))
 
 @router.delete("/{job_id}")
 def delete_job(
     job_id: int,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     job = db.query(Job).filter(Job.id == job_id).first()
     if not job:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
     
+    cv_urls = [url for (url,) in db.query(Application.cv_url).filter(Application.job_id == job_id, Application.cv_url != None).distinct()]
+
     # Delete related applications first
     db.query(Application).filter(Application.job_id == job_id).delete()
     
     db.delete(job)
     db.commit()
+    release_cvs(db, cv_urls)
+    invalidate_job_results()
+    job_board.rebuild(db)
     return {"message": "Job deleted successfully"}
 
 @router.patch("/{job_id}/toggle", response_model=JobResponse)
 def toggle_job(
     job_id: int,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     job = db.query(Job).filter(Job.id == job_id).first()
@@ -125,5 +140,7 @@ def toggle_job(
     job.is_active = not job.is_active
     db.commit()
     db.refresh(job)
-    return job_to_response(job)
+    invalidate_job_results()
+    job_board.rebuild(db)
+    return job_to_response(job, applicant_count(db, job.id))
 # force redeploy Fri Mar  6 11:20:58 GMT 2026
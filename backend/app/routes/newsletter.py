@@ -1,36 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index, text
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 from app.database import get_db, Base
 from app.models import Admin
 from app.services.auth_service import get_current_admin
-import httpx
+from app.services.pagination import keyset_order, keyset_page, set_page_headers, MAX_PAGE_SIZE
+from app.services.exports import ExportFormat, export_response
+from app.services.newsletter_outbox import create_campaign, campaign_progress, outbox_worker
+from app.services.newsletter_assets import asset_cache, attachment_payloads, load_uploads
+from app.services.uploads import spool_to_temp
+from app.services.cloudinary_client import get_uploader
+import asyncio
 import os
-import shutil
 import uuid
-import cloudinary
-import cloudinary.uploader
-import tempfile
 
 router = APIRouter(prefix="/api/newsletter", tags=["Newsletter"])
 
-NEWSLETTER_UPLOAD_DIR = "uploads/newsletter"
-os.makedirs(NEWSLETTER_UPLOAD_DIR, exist_ok=True)
-
 BACKEND_URL = os.getenv("BACKEND_URL", "https://luton-friendship-homecarers-production.up.railway.app")
 
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET")
-)
-
 # ── Models ─────────────────────────────────────────────
 class NewsletterSubscriber(Base):
     __tablename__ = "newsletter_subscribers"
+    __table_args__ = (Index("ix_newsletter_subscribers_subscribed_at_id", "subscribed_at", "id"),)
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     email = Column(String(255), unique=True, nullable=False)
     name = Column(String(255), nullable=True)
@@ -65,13 +59,57 @@ def subscribe(data: SubscribeRequest, db: Session = Depends(get_db)):
     return {"message": "Successfully subscribed!"}
 
 # ── Subscribers ────────────────────────────────────────
+def _subscriber_query(db: Session, is_active, subscribed_from, subscribed_to):
+    query = db.query(
+        NewsletterSubscriber.id,
+        NewsletterSubscriber.email,
+        NewsletterSubscriber.name,
+        NewsletterSubscriber.is_active,
+        NewsletterSubscriber.subscribed_at,
+    )
+    if is_active is not None:
+        query = query.filter(NewsletterSubscriber.is_active == is_active)
+    if subscribed_from:
+        query = query.filter(NewsletterSubscriber.subscribed_at >= subscribed_from)
+    if subscribed_to:
+        query = query.filter(NewsletterSubscriber.subscribed_at < subscribed_to)
+    return query
+
 @router.get("/subscribers", dependencies=[Depends(get_current_admin)])
-def get_subscribers(db: Session = Depends(get_db)):
-    rows = db.execute(
-        text("SELECT id, email, name, is_active, subscribed_at FROM newsletter_subscribers ORDER BY subscribed_at DESC")
-    ).fetchall()
+def get_subscribers(
+    response: Response,
+    db: Session = Depends(get_db),
+    is_active: Optional[bool] = None,
+    subscribed_from: Optional[datetime] = None,
+    subscribed_to: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order: Literal["desc", "asc"] = "desc",
+    include_total: bool = True,
+):
+    query = _subscriber_query(db, is_active, subscribed_from, subscribed_to)
+    page = keyset_page(
+        query, NewsletterSubscriber.subscribed_at, NewsletterSubscriber.id,
+        limit=limit, cursor=cursor, descending=order == "desc", include_total=include_total,
+    )
+    set_page_headers(response, page)
+    rows = page.rows
     return [{"id": r[0], "email": r[1], "name": r[2], "is_active": r[3], "subscribed_at": r[4]} for r in rows]
 
+@router.get("/subscribers/export", dependencies=[Depends(get_current_admin)])
+def export_subscribers(
+    is_active: Optional[bool] = None,
+    subscribed_from: Optional[datetime] = None,
+    subscribed_to: Optional[datetime] = None,
+    order: Literal["desc", "asc"] = "desc",
+    format: ExportFormat = "csv",
+):
+    def build_query(db: Session):
+        query = _subscriber_query(db, is_active, subscribed_from, subscribed_to)
+        return keyset_order(query, NewsletterSubscriber.subscribed_at, NewsletterSubscriber.id, descending=order == "desc")
+
+    return export_response(build_query, format, "subscribers")
+
 @router.delete("/subscribers/{subscriber_id}", dependencies=[Depends(get_current_admin)])
 def delete_subscriber(subscriber_id: int, db: Session = Depends(get_db)):
     db.execute(text("DELETE FROM newsletter_subscribers WHERE id = :id"), {"id": subscriber_id})
@@ -81,42 +119,26 @@ def delete_subscriber(subscriber_id: int, db: Session = Depends(get_db)):
 # ── Send Newsletter ────────────────────────────────────
 @router.post("/send", dependencies=[Depends(get_current_admin)])
 async def send_newsletter(data: SendNewsletterRequest, db: Session = Depends(get_db)):
-    rows = db.execute(
-        text("SELECT email, name FROM newsletter_subscribers WHERE is_active = TRUE")
-    ).fetchall()
-    if not rows:
+    has_subscribers = db.execute(
+        text("SELECT 1 FROM newsletter_subscribers WHERE is_active = TRUE LIMIT 1")
+    ).fetchone()
+    if not has_subscribers:
         raise HTTPException(status_code=400, detail="No active subscribers")
 
-    resend_api_key = os.getenv("RESEND_API_KEY")
-    if not resend_api_key:
+    if not os.getenv("RESEND_API_KEY"):
         raise HTTPException(status_code=500, detail="Email service not configured")
 
-    # Fetch selected images
+    uploads = load_uploads(db, (data.image_ids or []) + (data.attachment_ids or []))
+
+    # Selected images
     images_html = ""
-    if data.image_ids:
-        for img_id in data.image_ids:
-            img = db.execute(text("SELECT url, original_name FROM newsletter_uploads WHERE id = :id"), {"id": img_id}).fetchone()
-            if img:
-                images_html += f'<div style="margin: 16px 0;"><img src="{img[0]}" alt="{img[1]}" style="max-width:100%; border-radius:8px;"></div>'
-
-    # Fetch attachments from Cloudinary URLs
-    attachments = []
-    if data.attachment_ids:
-        import base64
-        async with httpx.AsyncClient() as dl_client:
-            for att_id in data.attachment_ids:
-                att = db.execute(text("SELECT url, original_name FROM newsletter_uploads WHERE id = :id"), {"id": att_id}).fetchone()
-                if att:
-                    try:
-                        resp = await dl_client.get(att[0])
-                        if resp.status_code == 200:
-                            encoded = base64.b64encode(resp.content).decode()
-                            attachments.append({
-                                "filename": att[1],
-                                "content": encoded
-                            })
-                    except Exception:
-                        pass
+    for img_id in data.image_ids or []:
+        img = uploads.get(img_id)
+        if img:
+            images_html += f'<div style="margin: 16px 0;"><img src="{img[3]}" alt="{img[1]}" style="max-width:100%; border-radius:8px;"></div>'
+
+    # Attachments, from the local asset cache or fetched concurrently from Cloudinary
+    attachments = await attachment_payloads(uploads, data.attachment_ids)
 
     html_content = f"""
     <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
@@ -136,48 +158,28 @@ async def send_newsletter(data: SendNewsletterRequest, db: Session = Depends(get
     </div>
     """
 
-    emails = [r[0] for r in rows]
-    failed = []
-
-    async with httpx.AsyncClient() as client:
-        for email in emails:
-            payload = {
-                "from": "Luton Friendship Homecarers <onboarding@resend.dev>",
-                "to": [email],
-                "subject": data.subject,
-                "html": html_content
-            }
-            if attachments:
-                payload["attachments"] = attachments
-            try:
-                response = await client.post(
-                    "https://api.resend.com/emails",
-                    headers={"Authorization": f"Bearer {resend_api_key}", "Content-Type": "application/json"},
-                    json=payload
-                )
-                if response.status_code != 200:
-                    failed.append(email)
-            except Exception:
-                failed.append(email)
-
-    sent_count = len(emails) - len(failed)
-
-    # Save to history with attachment info
-    attachment_info = []
-    if data.attachment_ids:
-        for att_id in data.attachment_ids:
-            att = db.execute(text("SELECT original_name, url FROM newsletter_uploads WHERE id = :id"), {"id": att_id}).fetchone()
-            if att:
-                attachment_info.append({"name": att[0], "url": att[1]})
+    # Copied to newsletter_history when the outbox finishes the campaign
+    attachment_info = [
+        {"name": uploads[att_id][1], "url": uploads[att_id][3]}
+        for att_id in dict.fromkeys(data.attachment_ids or []) if att_id in uploads
+    ]
 
-    import json
-    db.execute(
-        text("INSERT INTO newsletter_history (subject, message, sent_to, failed, attachments) VALUES (:subject, :message, :sent_to, :failed, :attachments)"),
-        {"subject": data.subject, "message": data.message, "sent_to": sent_count, "failed": len(failed), "attachments": json.dumps(attachment_info)}
-    )
+    campaign = create_campaign(db, data.subject, data.message, html_content, attachments, attachment_info)
     db.commit()
+    outbox_worker.notify()
 
-    return {"message": f"Newsletter sent to {sent_count} subscribers", "failed": failed}
+    return {
+        "message": f"Newsletter queued for {campaign.total} subscribers",
+        "campaign_id": campaign.id,
+        "recipients": campaign.total,
+    }
+
+@router.get("/campaigns/{campaign_id}", dependencies=[Depends(get_current_admin)])
+def get_campaign_progress(campaign_id: int, db: Session = Depends(get_db)):
+    progress = campaign_progress(db, campaign_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return progress
 
 # ── History ────────────────────────────────────────────
 @router.get("/history", dependencies=[Depends(get_current_admin)])
@@ -197,6 +199,24 @@ def get_newsletter_history(db: Session = Depends(get_db)):
     return result
 
 # ── Uploads ────────────────────────────────────────────
+# Above this size Cloudinary's chunked upload API is used
+CHUNKED_UPLOAD_THRESHOLD = 20 * 1024 * 1024
+
+
+def upload_to_cloudinary(path: str, **options) -> dict:
+    uploader = get_uploader()
+    if os.path.getsize(path) > CHUNKED_UPLOAD_THRESHOLD:
+        return uploader.upload_large(path, chunk_size=CHUNKED_UPLOAD_THRESHOLD // 4, **options)
+    return uploader.upload(path, **options)
+
+def _insert_upload(db: Session, values: dict) -> int:
+    upload_id = db.execute(
+        text("INSERT INTO newsletter_uploads (filename, original_name, file_type, file_size, url) VALUES (:filename, :original_name, :file_type, :file_size, :url) RETURNING id"),
+        values
+    ).scalar_one()
+    db.commit()
+    return upload_id
+
 @router.post("/uploads", dependencies=[Depends(get_current_admin)])
 async def upload_newsletter_file(file: UploadFile = File(...), db: Session = Depends(get_db)):
     allowed_extensions = ['.pdf', '.doc', '.docx', '.jpg', '.jpeg', '.png', '.gif']
@@ -207,32 +227,23 @@ async def upload_newsletter_file(file: UploadFile = File(...), db: Session = Dep
     file_type = "image" if file_ext in ['.jpg', '.jpeg', '.png', '.gif'] else "document"
     unique_filename = f"{uuid.uuid4()}{file_ext}"
 
-    # Save temp file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp:
-        shutil.copyfileobj(file.file, tmp)
-        tmp_path = tmp.name
-
-    file_size = os.path.getsize(tmp_path)
-
-    # Upload to Cloudinary
-    resource_type = "image" if file_type == "image" else "raw"
-    upload_result = cloudinary.uploader.upload(
-        tmp_path,
-        public_id=f"newsletter/{unique_filename}",
-        resource_type=resource_type
-    )
-    os.unlink(tmp_path)
+    # Spool to a temp file and upload to Cloudinary without blocking the event loop
+    tmp_path, file_size = await spool_to_temp(file, suffix=file_ext)
+    try:
+        resource_type = "image" if file_type == "image" else "raw"
+        upload_result = await asyncio.to_thread(
+            upload_to_cloudinary, tmp_path, public_id=f"newsletter/{unique_filename}", resource_type=resource_type
+        )
+    finally:
+        os.unlink(tmp_path)
 
     cloudinary_url = upload_result["secure_url"]
 
-    db.execute(
-        text("INSERT INTO newsletter_uploads (filename, original_name, file_type, file_size, url) VALUES (:filename, :original_name, :file_type, :file_size, :url)"),
+    upload_id = await asyncio.to_thread(
+        _insert_upload, db,
         {"filename": unique_filename, "original_name": file.filename, "file_type": file_type, "file_size": file_size, "url": cloudinary_url}
     )
-    db.commit()
-
-    result = db.execute(text("SELECT id FROM newsletter_uploads WHERE filename = :filename"), {"filename": unique_filename}).fetchone()
-    return {"id": result[0], "filename": unique_filename, "original_name": file.filename, "file_type": file_type, "file_size": file_size, "url": cloudinary_url}
+    return {"id": upload_id, "filename": unique_filename, "original_name": file.filename, "file_type": file_type, "file_size": file_size, "url": cloudinary_url}
 
 @router.get("/uploads", dependencies=[Depends(get_current_admin)])
 def get_newsletter_uploads(db: Session = Depends(get_db)):
@@ -249,9 +260,10 @@ def delete_newsletter_upload(upload_id: int, db: Session = Depends(get_db)):
     try:
         resource_type = "image" if row[1] == "image" else "raw"
         public_id = f"newsletter/{row[0]}"
-        cloudinary.uploader.destroy(public_id, resource_type=resource_type)
+        get_uploader().destroy(public_id, resource_type=resource_type)
     except Exception:
         pass
     db.execute(text("DELETE FROM newsletter_uploads WHERE id = :id"), {"id": upload_id})
     db.commit()
+    asset_cache.discard(upload_id)
     return {"message": "File deleted"}
@@ -3,22 +3,18 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from app.database import get_db
 from app.models import Admin, NotificationPreference, Application, Job
+from app.services.analytics_queries import visit_metrics, page_view_metrics
+from app.services.rollups import rollup_watermark
 from datetime import datetime, timedelta
-import os, httpx
+from app.services.notifications import notifications
+import os
 
 router = APIRouter(prefix="/api/reports", tags=["Reports"])
 
 SECRET = os.getenv("REPORTS_SECRET", "luton-reports-secret")
 
 def send_email(to: str, subject: str, html: str):
-    resend_api_key = os.getenv("RESEND_API_KEY")
-    if not resend_api_key:
-        return
-    httpx.post(
-        "https://api.resend.com/emails",
-        headers={"Authorization": f"Bearer {resend_api_key}", "Content-Type": "application/json"},
-        json={"from": "onboarding@resend.dev", "to": [to], "subject": subject, "html": html}
-    )
+    notifications.send(to, subject, html)
 
 @router.post("/send")
 def send_report(report_type: str = Query(..., description="weekly or monthly"), secret: str = Query(...), db: Session = Depends(get_db)):
@@ -47,14 +43,14 @@ def send_report(report_type: str = Query(..., description="weekly or monthly"),
     new_apps = db.execute(text("SELECT COUNT(*) FROM applications WHERE applied_at >= :s"), {"s": since}).scalar() or 0
     total_apps = db.execute(text("SELECT COUNT(*) FROM applications")).scalar() or 0
     new_contacts = db.execute(text("SELECT COUNT(*) FROM contact_inquiries WHERE created_at >= :s"), {"s": since}).scalar() or 0
-    visitors = db.execute(text("SELECT COUNT(*) FROM site_visits WHERE visited_at >= :s"), {"s": since}).scalar() or 0
-    page_views = db.execute(text("SELECT COUNT(*) FROM page_views WHERE viewed_at >= :s"), {"s": since}).scalar() or 0
+    watermark = rollup_watermark(db)
+    visitors = visit_metrics(db, since, watermark).visitors
+    views = page_view_metrics(db, since, watermark)
+    page_views = views.page_views
     active_jobs = db.execute(text("SELECT COUNT(*) FROM jobs WHERE is_active = true")).scalar() or 0
 
     # Top pages
-    top_pages = db.execute(text(
-        "SELECT page, COUNT(*) as views FROM page_views WHERE viewed_at >= :s GROUP BY page ORDER BY views DESC LIMIT 5"
-    ), {"s": since}).fetchall()
+    top_pages = views.top_pages(5)
     top_pages_html = "".join([f"<tr><td>{r[0]}</td><td>{r[1]}</td></tr>" for r in top_pages])
 
     html = f"""
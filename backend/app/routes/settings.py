@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models import Admin, NotificationPreference, SystemSetting
-from app.services.auth_service import get_current_admin
+from app.models import NotificationPreference, SystemSetting
+from app.services.auth_service import AdminPrincipal, get_current_admin
 from app.schemas import (
     SystemSettingsResponse,
     SystemSettingsUpdate,
@@ -17,7 +17,7 @@ router = APIRouter(prefix="/api/settings", tags=["Settings"])
 # ── System Settings ─────────────────────────────────────
 @router.get("/system", response_model=SystemSettingsResponse)
 def get_system_settings(
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     settings = db.query(SystemSetting).filter(SystemSetting.admin_id == current_admin.id).first()
@@ -29,7 +29,7 @@ def get_system_settings(
 @router.put("/system", response_model=SystemSettingsResponse)
 def update_system_settings(
     update: SystemSettingsUpdate,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     settings = db.query(SystemSetting).filter(SystemSetting.admin_id == current_admin.id).first()
@@ -58,7 +58,7 @@ def update_system_settings(
 @router.put("/social", response_model=SystemSettingsResponse)
 def update_social_media(
     update: SocialMediaUpdate,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     settings = db.query(SystemSetting).filter(SystemSetting.admin_id == current_admin.id).first()
@@ -82,7 +82,7 @@ def update_social_media(
 # ── Notification Preferences ────────────────────────────
 @router.get("/notifications", response_model=NotificationPrefsResponse)
 def get_notification_prefs(
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     prefs = db.query(NotificationPreference).filter(NotificationPreference.admin_id == current_admin.id).first()
@@ -94,7 +94,7 @@ def get_notification_prefs(
 @router.put("/notifications", response_model=NotificationPrefsResponse)
 def update_notification_prefs(
     update: NotificationPrefsUpdate,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     prefs = db.query(NotificationPreference).filter(NotificationPreference.admin_id == current_admin.id).first()
@@ -1,14 +1,26 @@
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import text
-from pydantic import BaseModel
-from typing import Optional
-from app.database import get_db
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from typing import Optional, List, Literal, Union, Annotated
+from app.database import get_db, get_async_db, AsyncDB
 from app.services.auth_service import get_current_admin
+from app.services.analytics_queries import visit_metrics, page_view_metrics
+from app.services.rollups import rollup_watermark
+from app.services.cache import cached, TRACKING_STATS
+from app.services.tracking_ingest import (
+    ingest_buffer,
+    write_tracking_batch,
+    UPDATE_SITE_VISITS,
+    PageViewEvent,
+    SessionStartEvent,
+    SessionEndEvent,
+)
 from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/api/tracking", tags=["Tracking"])
 
+ALL_TIME = datetime(1970, 1, 1)
+
 class TrackRequest(BaseModel):
     page: str
     referrer: Optional[str] = None
@@ -46,66 +58,47 @@ def detect_source(referrer: str) -> str:
     return 'Referral'
 
 @router.post("/track")
-async def track_visit(data: TrackRequest, request: Request, db: Session = Depends(get_db)):
+async def track_visit(data: TrackRequest, request: Request):
     user_agent = request.headers.get("user-agent", "")
-    device = detect_device(user_agent)
-    browser = detect_browser(user_agent)
-    source = detect_source(data.referrer or "")
-
-    # Record page view
-    db.execute(
-        text("INSERT INTO page_views (page, referrer, device, browser, session_id) VALUES (:page, :referrer, :device, :browser, :session_id)"),
-        {"page": data.page, "referrer": data.referrer or "", "device": device, "browser": browser, "session_id": data.session_id}
-    )
-
-    # Record unique visit (ignore if session already exists)
-    db.execute(
-        text("""INSERT INTO site_visits (session_id, device, browser, referrer, landing_page)
-                VALUES (:session_id, :device, :browser, :referrer, :landing_page)
-                ON CONFLICT (session_id) DO NOTHING"""),
-        {"session_id": data.session_id, "device": device, "browser": browser, "referrer": source, "landing_page": data.landing_page or data.page}
-    )
-    db.commit()
+
+    # Queue the page view; the ingest buffer writes it in the next batch
+    await ingest_buffer.put(PageViewEvent(
+        page=data.page,
+        referrer=data.referrer or "",
+        device=detect_device(user_agent),
+        browser=detect_browser(user_agent),
+        session_id=data.session_id,
+        source=detect_source(data.referrer or ""),
+        landing_page=data.landing_page or data.page,
+    ))
     return {"ok": True}
 
+@router.get("/ingest", dependencies=[Depends(get_current_admin)])
+def get_ingest_stats():
+    return ingest_buffer.stats()
+
 @router.get("/stats", dependencies=[Depends(get_current_admin)])
-def get_stats(db: Session = Depends(get_db)):
+@cached(TRACKING_STATS)
+def get_stats(response: Response, db: Session = Depends(get_db)):
     now = datetime.utcnow()
     week_ago = now - timedelta(days=7)
     month_ago = now - timedelta(days=30)
 
+    watermark = rollup_watermark(db)
+
     # Total counts
-    total_visitors = db.execute(text("SELECT COUNT(*) FROM site_visits")).scalar()
-    total_pageviews = db.execute(text("SELECT COUNT(*) FROM page_views")).scalar()
-
-    # Last 7 days
-    weekly_visitors = db.execute(text("SELECT COUNT(*) FROM site_visits WHERE visited_at >= :w"), {"w": week_ago}).scalar()
-    weekly_pageviews = db.execute(text("SELECT COUNT(*) FROM page_views WHERE viewed_at >= :w"), {"w": week_ago}).scalar()
-
-    # Daily page views for last 7 days
-    daily = db.execute(text("""
-        SELECT DATE(viewed_at) as day, COUNT(*) as views
-        FROM page_views WHERE viewed_at >= :w
-        GROUP BY DATE(viewed_at) ORDER BY day
-    """), {"w": week_ago}).fetchall()
-
-    # Traffic sources
-    sources = db.execute(text("""
-        SELECT referrer, COUNT(*) as count FROM site_visits
-        WHERE visited_at >= :w GROUP BY referrer ORDER BY count DESC
-    """), {"w": week_ago}).fetchall()
-
-    # Device breakdown
-    devices = db.execute(text("""
-        SELECT device, COUNT(*) as count FROM site_visits
-        WHERE visited_at >= :w GROUP BY device ORDER BY count DESC
-    """), {"w": week_ago}).fetchall()
-
-    # Top pages
-    top_pages = db.execute(text("""
-        SELECT page, COUNT(*) as views FROM page_views
-        WHERE viewed_at >= :w GROUP BY page ORDER BY views DESC LIMIT 5
-    """), {"w": week_ago}).fetchall()
+    total_visitors = visit_metrics(db, ALL_TIME, watermark).visitors
+    total_pageviews = page_view_metrics(db, ALL_TIME, watermark).page_views
+
+    # Last 7 days, one scan per table
+    visits = visit_metrics(db, week_ago, watermark)
+    views = page_view_metrics(db, week_ago, watermark)
+    weekly_visitors = visits.visitors
+    weekly_pageviews = views.page_views
+    daily = views.daily
+    sources = visits.sources
+    devices = visits.devices
+    top_pages = views.top_pages(5)
 
     total_source = sum(r[1] for r in sources) or 1
     total_device = sum(r[1] for r in devices) or 1
@@ -127,19 +120,103 @@ class SessionEndRequest(BaseModel):
     bounced: bool
 
 @router.patch("/session")
-async def update_session(data: SessionEndRequest, db: Session = Depends(get_db)):
-    db.execute(
-        text("UPDATE site_visits SET duration_seconds = :d, bounced = :b WHERE session_id = :s"),
-        {"d": data.duration, "b": data.bounced, "s": data.session_id}
-    )
-    db.commit()
+async def update_session(data: SessionEndRequest, db: AsyncDB = Depends(get_async_db)):
+    await db.execute(UPDATE_SITE_VISITS, {"d": data.duration, "b": data.bounced, "s": data.session_id})
+    await db.commit()
     return {"ok": True}
 
 @router.post("/session-end")
-async def session_end(data: SessionEndRequest, db: Session = Depends(get_db)):
-    db.execute(
-        text("UPDATE site_visits SET duration_seconds = :d, bounced = :b WHERE session_id = :s"),
-        {"d": data.duration, "b": data.bounced, "s": data.session_id}
-    )
-    db.commit()
+async def session_end(data: SessionEndRequest, db: AsyncDB = Depends(get_async_db)):
+    await db.execute(UPDATE_SITE_VISITS, {"d": data.duration, "b": data.bounced, "s": data.session_id})
+    await db.commit()
     return {"ok": True}
+
+# ── Batch ──────────────────────────────────────────────
+MAX_BATCH_EVENTS = 500
+# Generous for MAX_BATCH_EVENTS events, and checked before any parsing
+MAX_BATCH_BYTES = 256 * 1024
+
+class PageViewBatchItem(BaseModel):
+    type: Literal["page_view"]
+    page: str
+    referrer: Optional[str] = None
+    session_id: str
+    landing_page: Optional[str] = None
+
+class SessionStartBatchItem(BaseModel):
+    type: Literal["session_start"]
+    session_id: str
+    referrer: Optional[str] = None
+    landing_page: Optional[str] = None
+
+class SessionEndBatchItem(BaseModel):
+    type: Literal["session_end"]
+    session_id: str
+    duration: int
+    bounced: bool
+
+BatchItem = Annotated[
+    Union[PageViewBatchItem, SessionStartBatchItem, SessionEndBatchItem],
+    Field(discriminator="type"),
+]
+batch_adapter = TypeAdapter(List[BatchItem])
+
+async def read_body_limited(request: Request, limit: int) -> bytes:
+    """The request body, or a 413 as soon as it is known to exceed ``limit`` bytes."""
+    too_large = HTTPException(status_code=413, detail=f"Request body over {limit} bytes")
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise too_large
+    # Content-Length may be absent (chunked) or wrong, so count as the body arrives
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise too_large
+    return bytes(body)
+
+@router.post("/batch")
+async def track_batch(request: Request, db: AsyncDB = Depends(get_async_db)):
+    # sendBeacon posts text/plain, so parse the raw body rather than relying on Content-Type
+    body = await read_body_limited(request, MAX_BATCH_BYTES)
+    try:
+        items = batch_adapter.validate_json(body)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    if len(items) > MAX_BATCH_EVENTS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_EVENTS} events per batch")
+
+    user_agent = request.headers.get("user-agent", "")
+    device = detect_device(user_agent)
+    browser = detect_browser(user_agent)
+
+    page_views, session_starts, session_ends = [], [], []
+    for item in items:
+        if item.type == "page_view":
+            page_views.append(PageViewEvent(
+                page=item.page,
+                referrer=item.referrer or "",
+                device=device,
+                browser=browser,
+                session_id=item.session_id,
+                source=detect_source(item.referrer or ""),
+                landing_page=item.landing_page or item.page,
+            ))
+        elif item.type == "session_start":
+            session_starts.append(SessionStartEvent(
+                session_id=item.session_id,
+                device=device,
+                browser=browser,
+                source=detect_source(item.referrer or ""),
+                landing_page=item.landing_page or None,
+            ))
+        else:
+            session_ends.append(SessionEndEvent(session_id=item.session_id, duration=item.duration, bounced=item.bounced))
+
+    try:
+        await db.run_sync(write_tracking_batch, page_views, session_starts, session_ends)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return {"ok": True, "accepted": len(items)}
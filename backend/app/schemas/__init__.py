@@ -121,7 +121,7 @@ class JobResponse(BaseModel):
         from_attributes = True
 
     @classmethod
-    def from_orm_job(cls, job):
+    def from_orm_job(cls, job, applicants: int = 0):
         return cls(
             id=job.id, title=job.title, category=job.category,
             job_type=job.job_type, location=job.location, salary=job.salary,
@@ -134,7 +134,7 @@ class JobResponse(BaseModel):
             benefits=parse(job.benefits), training=job.training,
             tags=parse(job.tags), start_date=job.start_date,
             is_active=job.is_active,
-            applicants=len(job.applications) if job.applications else 0,
+            applicants=applicants,
             application_deadline=job.application_deadline.strftime('%Y-%m-%d') if job.application_deadline else None,
             created_at=job.created_at, updated_at=job.updated_at,
         )
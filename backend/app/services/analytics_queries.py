@@ -0,0 +1,190 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+from app.services.hll import HyperLogLog
+
+# Closed days in [a, b) are read from the daily rollups; raw rows are only
+# scanned for the partial days either side of that span. GROUPING() tells
+# the overall row apart from the per-source and per-device rows.
+VISIT_METRICS_SQL = text("""
+    SELECT GROUPING(source) AS all_sources, GROUPING(device) AS all_devices,
+           source, device,
+           SUM(visits) AS visits,
+           SUM(bounces) AS bounced,
+           SUM(duration_sum) AS duration_sum,
+           SUM(duration_count) AS duration_count
+    FROM (
+        SELECT COALESCE(referrer, '') AS source, COALESCE(device, '') AS device,
+               COUNT(*) AS visits,
+               COUNT(*) FILTER (WHERE bounced = TRUE) AS bounces,
+               COALESCE(SUM(duration_seconds) FILTER (WHERE duration_seconds > 0), 0) AS duration_sum,
+               COUNT(*) FILTER (WHERE duration_seconds > 0) AS duration_count
+        FROM site_visits
+        WHERE (visited_at >= :s AND visited_at < :a) OR visited_at >= :b
+        GROUP BY 1, 2
+        UNION ALL
+        SELECT source, device, visits, bounces, duration_sum, duration_count
+        FROM visit_daily_rollups
+        WHERE day >= :a AND day < :b
+    ) t
+    GROUP BY GROUPING SETS ((), (source), (device))
+""")
+
+PAGE_VIEW_METRICS_SQL = text("""
+    SELECT GROUPING(day) AS all_days, GROUPING(page) AS all_pages,
+           day, page,
+           SUM(views) AS views
+    FROM (
+        SELECT DATE(viewed_at) AS day, page, COUNT(*) AS views
+        FROM page_views
+        WHERE (viewed_at >= :s AND viewed_at < :a) OR viewed_at >= :b
+        GROUP BY 1, 2
+        UNION ALL
+        SELECT day, page, views
+        FROM page_daily_rollups
+        WHERE day >= :a AND day < :b
+    ) t
+    GROUP BY GROUPING SETS ((), (day), (page))
+""")
+
+# Exact figures straight from page_views, for audits
+EXACT_PAGE_VIEW_METRICS_SQL = text("""
+    SELECT GROUPING(DATE(viewed_at)) AS all_days, GROUPING(page) AS all_pages,
+           DATE(viewed_at) AS day, page,
+           COUNT(*) AS views,
+           COUNT(DISTINCT session_id) AS unique_visitors
+    FROM page_views
+    WHERE viewed_at >= :s
+    GROUP BY GROUPING SETS ((), (DATE(viewed_at)), (page))
+""")
+
+PAGE_SKETCHES_SQL = text("""
+    SELECT page, sessions_hll FROM page_daily_rollups
+    WHERE page IN :pages AND day >= :a AND day < :b AND sessions_hll IS NOT NULL
+""").bindparams(bindparam("pages", expanding=True))
+
+RAW_PAGE_SESSIONS_SQL = text("""
+    SELECT DISTINCT page, session_id FROM page_views
+    WHERE page IN :pages AND ((viewed_at >= :s AND viewed_at < :a) OR viewed_at >= :b)
+""").bindparams(bindparam("pages", expanding=True))
+
+
+@dataclass
+class VisitMetrics:
+    visitors: int = 0
+    bounced: int = 0
+    duration_sum: int = 0
+    duration_count: int = 0
+    sources: List[Tuple[str, int]] = field(default_factory=list)
+    devices: List[Tuple[str, int]] = field(default_factory=list)
+
+    @property
+    def avg_duration(self) -> float:
+        return self.duration_sum / self.duration_count if self.duration_count else 0
+
+
+@dataclass
+class PageViewMetrics:
+    page_views: int = 0
+    daily: List[Tuple[object, int]] = field(default_factory=list)
+    pages: List[Tuple[str, int]] = field(default_factory=list)
+    unique_visitors: Dict[str, int] = field(default_factory=dict)
+
+    def top_pages(self, limit: int = 5) -> List[Tuple[str, int, int]]:
+        return [(page, views, self.unique_visitors.get(page, 0)) for page, views in self.pages[:limit]]
+
+
+def _by_count_desc(rows):
+    return sorted(rows, key=lambda r: r[1], reverse=True)
+
+
+def rollup_span(since: datetime, watermark: Optional[date], now: Optional[datetime] = None) -> dict:
+    """Bind parameters splitting [since, now) into rolled-up days and raw edges."""
+    now = now or datetime.utcnow()
+    first_full = since.date() if since.time() == datetime.min.time() else since.date() + timedelta(days=1)
+    last_full = min(watermark, now.date()) if watermark else first_full
+    if first_full >= last_full:
+        return {"s": since, "a": since, "b": since}
+    return {
+        "s": since,
+        "a": datetime(first_full.year, first_full.month, first_full.day),
+        "b": datetime(last_full.year, last_full.month, last_full.day),
+    }
+
+
+def visit_metrics(db: Session, since: datetime, watermark: Optional[date] = None) -> VisitMetrics:
+    metrics = VisitMetrics()
+    sources, devices = [], []
+    for r in db.execute(VISIT_METRICS_SQL, rollup_span(since, watermark)):
+        if r.all_sources and r.all_devices:
+            metrics.visitors = int(r.visits or 0)
+            metrics.bounced = int(r.bounced or 0)
+            metrics.duration_sum = int(r.duration_sum or 0)
+            metrics.duration_count = int(r.duration_count or 0)
+        elif r.all_devices:
+            sources.append((r.source, int(r.visits)))
+        else:
+            devices.append((r.device, int(r.visits)))
+    metrics.sources = _by_count_desc(sources)
+    metrics.devices = _by_count_desc(devices)
+    return metrics
+
+
+def page_view_metrics(
+    db: Session,
+    since: datetime,
+    watermark: Optional[date] = None,
+    unique_pages: int = 0,
+    exact: bool = False,
+) -> PageViewMetrics:
+    """Page view totals for a window.
+
+    Unique sessions are filled in for the top ``unique_pages`` pages by
+    merging the per-day HyperLogLog sketches, which are within a few percent
+    of the true count. ``exact`` scans raw rows with COUNT(DISTINCT) instead
+    and ignores the rollups.
+    """
+    if exact:
+        return _exact_page_view_metrics(db, since)
+    span = rollup_span(since, watermark)
+    metrics = PageViewMetrics()
+    daily, pages = [], []
+    for r in db.execute(PAGE_VIEW_METRICS_SQL, span):
+        if r.all_days and r.all_pages:
+            metrics.page_views = int(r.views or 0)
+        elif r.all_pages:
+            daily.append((r.day, int(r.views)))
+        else:
+            pages.append((r.page, int(r.views)))
+    metrics.daily = sorted(daily, key=lambda r: r[0])
+    metrics.pages = _by_count_desc(pages)
+    if unique_pages and metrics.pages:
+        metrics.unique_visitors = page_unique_sessions(db, [p for p, _ in metrics.pages[:unique_pages]], span)
+    return metrics
+
+
+def page_unique_sessions(db: Session, pages: List[str], span: dict) -> Dict[str, int]:
+    sketches = {page: HyperLogLog() for page in pages}
+    for page, data in db.execute(PAGE_SKETCHES_SQL, {**span, "pages": pages}):
+        sketches[page].merge_bytes(data)
+    for page, session_id in db.execute(RAW_PAGE_SESSIONS_SQL, {**span, "pages": pages}):
+        sketches[page].add(session_id)
+    return {page: sketch.count() for page, sketch in sketches.items()}
+
+
+def _exact_page_view_metrics(db: Session, since: datetime) -> PageViewMetrics:
+    metrics = PageViewMetrics()
+    daily, pages = [], []
+    for r in db.execute(EXACT_PAGE_VIEW_METRICS_SQL, {"s": since}):
+        if r.all_days and r.all_pages:
+            metrics.page_views = r.views or 0
+        elif r.all_pages:
+            daily.append((r.day, r.views))
+        else:
+            pages.append((r.page, r.views))
+            metrics.unique_visitors[r.page] = r.unique_visitors
+    metrics.daily = sorted(daily, key=lambda r: r[0])
+    metrics.pages = _by_count_desc(pages)
+    return metrics
@@ -0,0 +1,74 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session, Query
+from app.models import Application, Job
+
+POSITION = func.coalesce(Job.title, "Unknown").label("position")
+
+# Columns behind ApplicationResponse, with the job title joined in
+LIST_COLUMNS = (
+    Application.id,
+    Application.job_id,
+    POSITION,
+    Application.name,
+    Application.email,
+    Application.phone,
+    Application.experience,
+    Application.availability,
+    Application.cv_url,
+    Application.status,
+    Application.applied_at,
+    Application.updated_at,
+)
+
+# Columns behind the dashboard "recent applications" cards
+SUMMARY_COLUMNS = (
+    Application.id,
+    Application.name,
+    POSITION,
+    Application.applied_at,
+    Application.status,
+)
+
+
+def application_projection(db: Session, *columns) -> Query:
+    """Select only ``columns`` from applications, outer-joined to jobs so the title comes back in the same statement."""
+    return db.query(*columns).select_from(Application).outerjoin(Job, Job.id == Application.job_id)
+
+
+def application_list(
+    db: Session,
+    status: Optional[str] = None,
+    job_id: Optional[int] = None,
+    applied_from: Optional[datetime] = None,
+    applied_to: Optional[datetime] = None,
+) -> Query:
+    query = application_projection(db, *LIST_COLUMNS)
+    if status:
+        query = query.filter(Application.status == status)
+    if job_id:
+        query = query.filter(Application.job_id == job_id)
+    if applied_from:
+        query = query.filter(Application.applied_at >= applied_from)
+    if applied_to:
+        query = query.filter(Application.applied_at < applied_to)
+    return query
+
+
+def recent_applications(db: Session, limit: int):
+    return (
+        application_projection(db, *SUMMARY_COLUMNS)
+        .order_by(Application.applied_at.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def application_cvs(db: Session, status: Optional[str] = None, job_id: Optional[int] = None):
+    query = db.query(Application.name, Application.cv_url).filter(Application.cv_url != None)
+    if status:
+        query = query.filter(Application.status == status)
+    if job_id:
+        query = query.filter(Application.job_id == job_id)
+    return [tuple(row) for row in query.order_by(Application.applied_at, Application.id)]
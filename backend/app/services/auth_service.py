@@ -1,5 +1,7 @@
 import bcrypt
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import Optional
 from jose import jwt, JWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -8,20 +10,14 @@ from app.config import settings
 from app.database import get_db
 from app.models import Admin
 from app.schemas import TokenData
+from app.services.cache import LRUCacheBackend
 import logging
 
 logger = logging.getLogger(__name__)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    logger.info(f"Verifying password...")
-    logger.info(f"Plain password: {plain_password}")
-    logger.info(f"Hashed password (full): {hashed_password}")
-    logger.info(f"Hash length: {len(hashed_password)}")
-    
     try:
-        result = bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
-        logger.info(f"bcrypt.checkpw result: {result}")
-        return result
+        return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
     except Exception as e:
         logger.error(f"bcrypt verification error: {e}")
         return False
@@ -32,16 +28,52 @@ def get_password_hash(password: str) -> str:
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
-    to_encode.update({"exp": expire})
+    now = datetime.utcnow()
+    expire = now + timedelta(minutes=settings.access_token_expire_minutes)
+    to_encode.update({"exp": expire, "iat": now})
     return jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+
+@dataclass(frozen=True)
+class AdminPrincipal:
+    """The authenticated admin as seen by request handlers; a detached, read-only snapshot of the row."""
+
+    id: int
+    email: str
+    name: str
+    role: str
+    phone: Optional[str] = None
+    profile_image_url: Optional[str] = None
+
+    @classmethod
+    def from_admin(cls, admin: Admin) -> "AdminPrincipal":
+        return cls(
+            id=admin.id,
+            email=admin.email,
+            name=admin.name,
+            role=admin.role,
+            phone=admin.phone,
+            profile_image_url=admin.profile_image_url,
+        )
+
+
+# Principals keyed by admin id and token issue time. The TTL bounds how long
+# another worker process can keep serving a principal after a change there.
+PRINCIPAL_NAMESPACE = "principal"
+_principals = LRUCacheBackend(max_entries=settings.cache_max_entries)
+
+
+def invalidate_principal(admin_id: int):
+    """Drop cached principals for an admin; call after any write to their row."""
+    _principals.invalidate(f"{PRINCIPAL_NAMESPACE}:{admin_id}")
+
+
 def get_current_admin(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
-) -> Admin:
+) -> AdminPrincipal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -56,9 +88,16 @@ def get_current_admin(
         token_data = TokenData(admin_id=admin_id, email=payload.get("email", ""), role=payload.get("role", ""))
     except JWTError:
         raise credentials_exception
+
+    key = f"{PRINCIPAL_NAMESPACE}:{token_data.admin_id}:{payload.get('iat', 0)}"
+    entry = _principals.get(key)
+    if entry is not None:
+        return entry.value
     
     admin = db.query(Admin).filter(Admin.id == token_data.admin_id).first()
     if admin is None or not admin.is_active:
         raise credentials_exception
-    
-    return admin
+
+    principal = AdminPrincipal.from_admin(admin)
+    _principals.set(key, principal, settings.principal_cache_ttl_seconds)
+    return principal
@@ -0,0 +1,143 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Optional, Tuple
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from app.config import settings
+
+CACHE_HEADER = "X-Cache"
+CACHE_AGE_HEADER = "X-Cache-Age"
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    stored_at: float
+    expires_at: float
+
+
+class CacheBackend(ABC):
+    """Interface for result cache storage.
+
+    Keys are strings of the form ``<namespace>:<params>`` so a shared store
+    such as Redis can implement ``invalidate`` with a prefix scan or a key
+    set per namespace.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float):
+        ...
+
+    @abstractmethod
+    def invalidate(self, namespace: str):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+
+class LRUCacheBackend(CacheBackend):
+    """In-process LRU with a per-entry TTL."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: Any, ttl: float):
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = CacheEntry(value=value, stored_at=now, expires_at=now + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, namespace: str):
+        prefix = f"{namespace}:"
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Namespaces for cached admin read endpoints
+ANALYTICS = "analytics"
+ANALYTICS_DASHBOARD = "analytics_dashboard"
+DASHBOARD = "dashboard"
+TRACKING_STATS = "tracking_stats"
+
+# Which cached results each kind of write makes stale
+APPLICATION_WRITES = (ANALYTICS, ANALYTICS_DASHBOARD, DASHBOARD)
+JOB_WRITES = (ANALYTICS, ANALYTICS_DASHBOARD, DASHBOARD)
+
+cache_backend: CacheBackend = LRUCacheBackend(max_entries=settings.cache_max_entries)
+
+
+def cache_key(namespace: str, *params) -> str:
+    return f"{namespace}:" + ":".join(str(p) for p in params)
+
+
+def invalidate(*namespaces: str):
+    for namespace in namespaces:
+        cache_backend.invalidate(namespace)
+
+
+def invalidate_application_results():
+    invalidate(*APPLICATION_WRITES)
+
+
+def invalidate_job_results():
+    invalidate(*JOB_WRITES)
+
+
+def _mark(response: Response, hit: bool, age: float):
+    response.headers[CACHE_HEADER] = "HIT" if hit else "MISS"
+    response.headers[CACHE_AGE_HEADER] = str(int(age))
+
+
+def cached(namespace: str, ttl: Optional[float] = None, key_params: Tuple[str, ...] = ()):
+    """Cache a sync route's JSON-encoded result under its namespace.
+
+    The route must accept a ``response: Response`` argument; the named
+    ``key_params`` are read from its keyword arguments to build the key.
+    The result is stored already encoded, so a hit skips both the queries
+    and response-model validation of the original objects.
+    """
+    def decorator(func: Callable):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            response: Response = kwargs["response"]
+            key = cache_key(namespace, *(kwargs.get(p) for p in key_params))
+            entry = cache_backend.get(key)
+            if entry is not None:
+                _mark(response, True, time.monotonic() - entry.stored_at)
+                return entry.value
+            value = jsonable_encoder(func(*args, **kwargs))
+            cache_backend.set(key, value, ttl if ttl is not None else settings.cache_ttl_seconds)
+            _mark(response, False, 0)
+            return value
+        return wrapper
+    return decorator
@@ -0,0 +1,22 @@
+import os
+import threading
+import cloudinary
+import cloudinary.uploader
+
+_configured = False
+_lock = threading.Lock()
+
+
+def get_uploader():
+    """Return ``cloudinary.uploader``, configuring the SDK from the environment on first use."""
+    global _configured
+    if not _configured:
+        with _lock:
+            if not _configured:
+                cloudinary.config(
+                    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
+                    api_key=os.getenv("CLOUDINARY_API_KEY"),
+                    api_secret=os.getenv("CLOUDINARY_API_SECRET"),
+                )
+                _configured = True
+    return cloudinary.uploader
@@ -0,0 +1,141 @@
+import asyncio
+import io
+import re
+import tempfile
+import zipfile
+from typing import AsyncIterator, BinaryIO, List, Tuple
+import httpx
+from app.services.cv_files import LOCAL_PREFIX, cv_media_type, local_cv_path
+from app.services.http_client import get_http_client
+from app.services.uploads import CHUNK_SIZE
+
+# Memory held per in-flight download before it spills to disk; memory
+# stays around concurrency * SPOOL_MEMORY regardless of export size.
+SPOOL_MEMORY = 4 * CHUNK_SIZE
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only stream that collects what zipfile writes so it can be yielded straight away.
+
+    It is not seekable, so zipfile writes each entry with a trailing data
+    descriptor and never needs to go back and patch a header.
+    """
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def archive_names(rows: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Pair each CV URL with a unique ``<applicant>_CV<ext>`` entry name."""
+    seen = {}
+    named = []
+    for applicant, url in rows:
+        ext, _ = cv_media_type(url)
+        stem = _UNSAFE.sub("_", applicant or "").strip("._") or "Applicant"
+        name = f"{stem}_CV{ext}"
+        count = seen.get(name.lower(), 0) + 1
+        seen[name.lower()] = count
+        if count > 1:
+            name = f"{stem}_CV ({count}){ext}"
+        named.append((name, url))
+    return named
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"HTTP {error.response.status_code}"
+    return getattr(error, "detail", None) or type(error).__name__
+
+
+async def _fetch(url: str) -> BinaryIO:
+    """Return a readable file holding the complete CV, or raise.
+
+    Local CVs are already complete on disk. Remote ones are downloaded to a
+    spooled temp file first, so a download that breaks off part way is
+    reported instead of leaving a truncated file in the archive.
+    """
+    if url.startswith(LOCAL_PREFIX):
+        return await asyncio.to_thread(open, local_cv_path(url), "rb")
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY)
+    try:
+        async with get_http_client().stream("GET", url) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                await asyncio.to_thread(spool.write, chunk)
+        spool.seek(0)
+        return spool
+    except BaseException:
+        spool.close()
+        raise
+
+
+def _discard(task: asyncio.Task):
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled() and task.exception() is None:
+        task.result().close()
+
+
+async def stream_cv_zip(entries: List[Tuple[str, str]], concurrency: int) -> AsyncIterator[bytes]:
+    """Yield a ZIP of ``(name, url)`` entries as it is built.
+
+    Up to ``concurrency`` files are fetched ahead of the one being written,
+    so slow remote objects overlap; each is held in memory only up to
+    SPOOL_MEMORY and on disk beyond that. Files that cannot be fetched in
+    full are listed in ``export_errors.txt`` at the end of the archive.
+    """
+    sink = _ZipSink()
+    archive = zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED)
+    fetches = {}
+    current = None
+    errors = []
+
+    def start(index: int):
+        if index < len(entries):
+            fetches[index] = asyncio.create_task(_fetch(entries[index][1]))
+
+    try:
+        for index in range(concurrency):
+            start(index)
+        for index, (name, _) in enumerate(entries):
+            current = fetches.pop(index)
+            start(index + concurrency)
+            try:
+                source = await current
+            except Exception as e:
+                errors.append(f"{name}: {_describe(e)}")
+                continue
+            with source, archive.open(name, "w") as entry:
+                while True:
+                    chunk = await asyncio.to_thread(source.read, CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    entry.write(chunk)
+                    yield sink.drain()
+            current = None
+            yield sink.drain()
+
+        if errors:
+            archive.writestr("export_errors.txt", "Could not include:\n" + "\n".join(errors) + "\n")
+        archive.close()
+        yield sink.drain()
+    finally:
+        # Reached on client disconnect too: stop every download still running
+        if current is not None:
+            _discard(current)
+        for task in fetches.values():
+            _discard(task)
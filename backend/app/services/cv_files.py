@@ -0,0 +1,154 @@
+import hashlib
+import os
+import re
+from email.utils import formatdate
+from typing import Optional, Tuple
+import anyio
+import httpx
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.services.http_client import get_http_client
+from app.services.uploads import CHUNK_SIZE, CV_SIGNATURES
+
+LOCAL_PREFIX = "/uploads/"
+
+MEDIA_TYPES = {ext: media_type for _, ext, media_type in CV_SIGNATURES}
+
+# Upstream headers worth handing back to the browser unchanged
+PASSTHROUGH_HEADERS = ("content-length", "content-range", "etag", "last-modified", "accept-ranges")
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def cv_media_type(url: str) -> Tuple[str, str]:
+    path = url.split("?", 1)[0].lower()
+    for ext in (".pdf", ".docx", ".doc"):
+        if ext in path:
+            return ext, MEDIA_TYPES[ext]
+    return ".pdf", MEDIA_TYPES[".pdf"]
+
+
+def local_cv_path(url: str) -> str:
+    """Map an ``/uploads/...`` URL onto the upload directory, refusing anything that escapes it."""
+    root = os.path.realpath(settings.cv_upload_dir)
+    path = os.path.realpath(os.path.join(root, url[len(LOCAL_PREFIX):]))
+    if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="File not found")
+    return path
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Return the inclusive (start, end) of a single ``bytes=`` range, or None to send the whole file.
+
+    Multi-range and malformed headers are ignored, which RFC 9110 allows.
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+async def read_file_chunks(path: str, start: int = 0, length: Optional[int] = None):
+    if length is None:
+        length = os.path.getsize(path) - start
+    async with await anyio.open_file(path, "rb") as f:
+        await f.seek(start)
+        while length > 0:
+            chunk = await f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def local_cv_response(request: Request, url: str, media_type: str, disposition: str) -> Response:
+    path = local_cv_path(url)
+    stat = os.stat(path)
+    etag = f'"{hashlib.md5(f"{stat.st_mtime}-{stat.st_size}".encode()).hexdigest()}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": disposition,
+    }
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    size = stat.st_size
+    byte_range = parse_range(request.headers.get("range"), size)
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        (start, end), status_code = byte_range, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    length = end - start + 1
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(read_file_chunks(path, start, length), status_code=status_code, media_type=media_type, headers=headers)
+
+
+async def _relay(upstream: httpx.Response):
+    # Closing in ``finally`` also returns the connection when the browser disconnects mid-download
+    try:
+        async for chunk in upstream.aiter_raw(CHUNK_SIZE):
+            yield chunk
+    finally:
+        await upstream.aclose()
+
+
+async def remote_cv_response(request: Request, url: str, media_type: str, disposition: str) -> Response:
+    """Relay a remote CV chunk by chunk over the shared client, forwarding Range and If-None-Match."""
+    forwarded = {"Accept-Encoding": "identity"}
+    for name in ("range", "if-none-match", "if-range"):
+        if name in request.headers:
+            forwarded[name] = request.headers[name]
+
+    client = get_http_client()
+    try:
+        upstream = await client.send(client.build_request("GET", url, headers=forwarded), stream=True)
+    except httpx.HTTPError:
+        raise HTTPException(status_code=502, detail="Could not fetch file")
+
+    if upstream.status_code not in (200, 206, 304, 416):
+        await upstream.aclose()
+        if upstream.status_code == 404:
+            raise HTTPException(status_code=404, detail="File not found")
+        raise HTTPException(status_code=502, detail="Could not fetch file")
+
+    headers = {name: upstream.headers[name] for name in PASSTHROUGH_HEADERS if name in upstream.headers}
+    headers["Content-Disposition"] = disposition
+    if upstream.status_code in (304, 416):
+        await upstream.aclose()
+        return Response(status_code=upstream.status_code, headers=headers)
+    return StreamingResponse(
+        _relay(upstream),
+        status_code=upstream.status_code,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+async def cv_response(request: Request, url: str, filename: str) -> Response:
+    ext, media_type = cv_media_type(url)
+    disposition = f'attachment; filename="{filename}_CV{ext}"'
+    if url.startswith(LOCAL_PREFIX):
+        return local_cv_response(request, url, media_type, disposition)
+    return await remote_cv_response(request, url, media_type, disposition)
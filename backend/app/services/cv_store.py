@@ -0,0 +1,114 @@
+import os
+import time
+import uuid
+from typing import Iterable, Optional
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+from app.config import settings
+
+# CVs are stored once per distinct content under <upload dir>/cv/ab/cd/<sha256><ext>.
+# There is no separate refcount column: the references are the
+# applications whose cv_url points at the blob.
+BLOB_DIR = "cv"
+TMP_DIR = ".tmp"
+URL_PREFIX = "/uploads/"
+
+COUNT_REFERENCES = text(
+    "SELECT cv_url, COUNT(*) FROM applications WHERE cv_url IN :urls GROUP BY cv_url"
+).bindparams(bindparam("urls", expanding=True))
+
+
+def temp_path(root: str) -> str:
+    directory = os.path.join(root, BLOB_DIR, TMP_DIR)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, uuid.uuid4().hex)
+
+
+def blob_relpath(digest: str, ext: str) -> str:
+    return f"{BLOB_DIR}/{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+
+def put_blob(root: str, tmp: str, digest: str, ext: str) -> str:
+    """Move a fully written temp file to its content address and return the relative path.
+
+    A duplicate simply replaces the identical blob; that refreshes its mtime,
+    which keeps a concurrent release or sweep from removing it before the new
+    application row is committed.
+    """
+    relpath = blob_relpath(digest, ext)
+    path = os.path.join(root, relpath)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(tmp, path)
+    return relpath
+
+
+def _local_path(root: str, url: str) -> Optional[str]:
+    if not url or not url.startswith(URL_PREFIX):
+        return None
+    root = os.path.realpath(root)
+    path = os.path.realpath(os.path.join(root, url[len(URL_PREFIX):]))
+    if os.path.commonpath([root, path]) != root:
+        return None
+    return path
+
+
+def _unlink_if_settled(path: str, now: float, grace: float) -> bool:
+    try:
+        if now - os.path.getmtime(path) < grace:
+            return False
+        os.unlink(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def referenced(db: Session, urls: Iterable[str]) -> set:
+    urls = list(urls)
+    found = set()
+    for i in range(0, len(urls), 500):
+        found.update(url for url, _ in db.execute(COUNT_REFERENCES, {"urls": urls[i:i + 500]}))
+    return found
+
+
+def release_cvs(db: Session, urls: Iterable[Optional[str]], root: Optional[str] = None) -> int:
+    """Remove local CV files that no application references any more. Call after the delete is committed."""
+    root = root or settings.cv_upload_dir
+    urls = {url for url in urls if _local_path(root, url)}
+    if not urls:
+        return 0
+    still_used = referenced(db, urls)
+    now = time.time()
+    removed = 0
+    for url in urls - still_used:
+        if _unlink_if_settled(_local_path(root, url), now, settings.cv_gc_grace_seconds):
+            removed += 1
+    return removed
+
+
+def collect_garbage(db: Session, root: Optional[str] = None) -> dict:
+    """Sweep the blob store for files no application references, plus abandoned temp files.
+
+    Anything younger than the grace period is left alone, since its
+    application row may not be committed yet.
+    """
+    root = root or settings.cv_upload_dir
+    base = os.path.join(root, BLOB_DIR)
+    now = time.time()
+    grace = settings.cv_gc_grace_seconds
+    candidates = {}
+    temp_removed = 0
+    for dirpath, _, filenames in os.walk(base):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if os.path.basename(dirpath) == TMP_DIR:
+                temp_removed += _unlink_if_settled(path, now, grace)
+                continue
+            url = URL_PREFIX + os.path.relpath(path, root).replace(os.sep, "/")
+            candidates[url] = path
+
+    still_used = referenced(db, candidates)
+    removed = 0
+    for url, path in candidates.items():
+        if url not in still_used and _unlink_if_settled(path, now, grace):
+            removed += 1
+    return {"scanned": len(candidates), "removed": removed, "temp_removed": temp_removed}
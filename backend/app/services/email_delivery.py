@@ -0,0 +1,193 @@
+import asyncio
+import json
+import os
+import random
+import time
+from dataclasses import dataclass, replace
+from typing import List, Optional, Sequence, Tuple, Union
+import httpx
+from app.config import settings
+from app.services.http_client import get_http_client
+
+RESEND_EMAILS_URL = "https://api.resend.com/emails"
+RESEND_BATCH_URL = "https://api.resend.com/emails/batch"
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class DeliveryResult:
+    recipient: str
+    ok: bool
+    status_code: Optional[int] = None
+    attempts: int = 0
+    error: Optional[str] = None
+
+    @property
+    def retryable(self) -> bool:
+        return self.status_code is None or self.status_code in RETRYABLE_STATUS
+
+
+class TokenBucket:
+    """Allow ``rate`` acquisitions per second on average, with bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[str] = None) -> float:
+    """Exponential backoff with full jitter, never shorter than the provider's Retry-After."""
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass
+    return delay
+
+
+class DeliveryEngine:
+    """Send email API requests concurrently, within the provider's rate limit.
+
+    ``concurrency`` bounds requests in flight and the token bucket bounds
+    requests per second, retries included. Engines that pass the same
+    ``bucket`` share one rate limit. 429 and 5xx responses and
+    transport errors are retried with backoff; anything else is final.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        url: str = RESEND_EMAILS_URL,
+        batch_url: str = RESEND_BATCH_URL,
+        rate_per_second: Optional[float] = None,
+        concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+        timeout: Optional[float] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        bucket: Optional[TokenBucket] = None,
+    ):
+        self.url = url
+        self.batch_url = batch_url
+        self.headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+        self.bucket = bucket or TokenBucket(rate_per_second or settings.email_rate_per_second)
+        self.concurrency = concurrency or settings.email_concurrency
+        self.max_retries = settings.email_max_retries if max_retries is None else max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = httpx.USE_CLIENT_DEFAULT if timeout is None else timeout
+        self.client = client
+
+    async def _deliver(self, url: str, body: bytes) -> DeliveryResult:
+        client = self.client or get_http_client()
+        result = DeliveryResult(recipient="", ok=False)
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            result.attempts = attempt + 1
+            retry_after = None
+            try:
+                response = await client.post(url, headers=self.headers, content=body, timeout=self.timeout)
+                result.status_code = response.status_code
+                if response.status_code < 300:
+                    result.ok = True
+                    result.error = None
+                    return result
+                result.error = response.text[:200]
+                if response.status_code not in RETRYABLE_STATUS:
+                    return result
+                retry_after = response.headers.get("retry-after")
+            except httpx.TransportError as e:
+                result.error = type(e).__name__
+            if attempt < self.max_retries:
+                await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_cap, retry_after))
+        return result
+
+    async def post(self, recipient: str, payload: Union[dict, bytes]) -> DeliveryResult:
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        result = await self._deliver(self.url, body)
+        result.recipient = recipient
+        return result
+
+    async def post_batch(self, recipients: Sequence[str], body: bytes) -> List[DeliveryResult]:
+        # The batch endpoint accepts or rejects the request as a whole
+        result = await self._deliver(self.batch_url, body)
+        return [replace(result, recipient=recipient) for recipient in recipients]
+
+    async def _pool(self, count: int, handle):
+        next_index = iter(range(count))
+
+        async def worker():
+            for i in next_index:
+                await handle(i)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, count))))
+
+    async def send_all(self, messages: Sequence[Tuple[str, Union[dict, bytes]]]) -> List[DeliveryResult]:
+        """Deliver each ``(recipient, payload)`` and return a result for each, in input order."""
+        results: List[Optional[DeliveryResult]] = [None] * len(messages)
+
+        async def handle(i):
+            results[i] = await self.post(*messages[i])
+
+        await self._pool(len(messages), handle)
+        return results
+
+    async def send_batches(self, batches: Sequence[Tuple[Sequence[str], bytes]]) -> List[List[DeliveryResult]]:
+        """Deliver each ``(recipients, body)`` batch request; results come back per batch, per recipient."""
+        results: List[Optional[List[DeliveryResult]]] = [None] * len(batches)
+
+        async def handle(i):
+            results[i] = await self.post_batch(*batches[i])
+
+        await self._pool(len(batches), handle)
+        return results
+
+
+class EncodedMessage:
+    """An email serialised once per campaign; only the recipient is spliced in per copy.
+
+    The provider's batch endpoint does not take attachments, so a message
+    with attachments goes out as one request per recipient, still without
+    re-encoding the body or the base64 payloads.
+    """
+
+    def __init__(self, fields: dict):
+        self._shared = json.dumps(fields, separators=(",", ":")).encode()[1:]
+        self.batchable = not fields.get("attachments")
+
+    def for_recipient(self, email: str) -> bytes:
+        return b'{"to":' + json.dumps([email]).encode() + b"," + self._shared
+
+
+def batch_body(items: Sequence[bytes]) -> bytes:
+    return b"[" + b",".join(items) + b"]"
+
+
+# The provider's rate limit is per API key, so every engine in the process draws from one bucket
+resend_bucket = TokenBucket(settings.email_rate_per_second)
+
+
+def resend_engine(**options) -> Optional[DeliveryEngine]:
+    api_key = os.getenv("RESEND_API_KEY")
+    if not api_key:
+        return None
+    options.setdefault("bucket", resend_bucket)
+    return DeliveryEngine(api_key, **options)
@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Callable, Iterator, Literal
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Query, Session
+from app.database import SessionLocal
+
+ExportFormat = Literal["csv", "ndjson"]
+
+# Rows fetched per round trip from the server-side cursor, and written per chunk
+EXPORT_BATCH_ROWS = 1000
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# Spreadsheets run cells starting with these as formulas (OWASP "CSV injection")
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Applicant-supplied text must open as text, not run as a formula
+        return "'" + value
+    return value
+
+
+def export_rows(build_query: Callable[[Session], Query], fmt: ExportFormat) -> Iterator[bytes]:
+    """Encode the rows of ``build_query(db)`` as CSV or NDJSON, one batch of rows per chunk.
+
+    The query runs on its own session with ``yield_per``, which on
+    PostgreSQL streams through a server-side cursor, so only one batch is
+    held in Python at a time. StreamingResponse drives this generator from
+    the threadpool.
+    """
+    db = SessionLocal()
+    try:
+        query = build_query(db).yield_per(EXPORT_BATCH_ROWS)
+        keys = [column["name"] for column in query.column_descriptions]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == "csv":
+            writer.writerow(keys)
+
+        pending = 0
+        for row in query:
+            if fmt == "csv":
+                writer.writerow([_csv_value(v) for v in row])
+            else:
+                buffer.write(json.dumps(dict(zip(keys, row)), default=_json_default))
+                buffer.write("\n")
+            pending += 1
+            if pending == EXPORT_BATCH_ROWS:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+    finally:
+        db.close()
+
+
+def export_response(build_query: Callable[[Session], Query], fmt: ExportFormat, name: str) -> StreamingResponse:
+    filename = f"{name}_{datetime.utcnow():%Y%m%d}.{fmt}"
+    return StreamingResponse(
+        export_rows(build_query, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
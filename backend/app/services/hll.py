@@ -0,0 +1,126 @@
+import hashlib
+import math
+import struct
+from typing import Iterable, Optional
+
+# 2^12 registers gives a standard error of about 1.04 / sqrt(4096) = 1.6%
+PRECISION = 12
+
+DENSE = 0
+SPARSE = 1
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _sigma(x: float) -> float:
+    # x + sum(x^(2^k) * 2^(k-1)) for k >= 1, summed until it stops changing
+    if x == 1:
+        return math.inf
+    y, z = 1.0, x
+    while True:
+        x *= x
+        previous = z
+        z += x * y
+        y += y
+        if z == previous:
+            return z
+
+
+def _tau(x: float) -> float:
+    if x == 0 or x == 1:
+        return 0.0
+    y, z = 1.0, 1 - x
+    while True:
+        x = math.sqrt(x)
+        previous = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == previous:
+            return z / 3
+
+
+class HyperLogLog:
+    """Mergeable approximate distinct counter.
+
+    Serialises to a one-byte header (format and precision) followed by either
+    every register (dense) or (index, rank) pairs for the non-zero registers
+    (sparse), whichever is smaller. Per-page daily sketches for a small site
+    are almost always sparse and only a few hundred bytes.
+    """
+
+    def __init__(self, precision: int = PRECISION, registers: Optional[bytearray] = None):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = registers if registers is not None else bytearray(self.m)
+
+    def add(self, value: str):
+        x = _hash64(value)
+        idx = x >> (64 - self.p)
+        rest = x & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def update(self, values: Iterable[str]):
+        for v in values:
+            self.add(v)
+
+    def merge(self, other: "HyperLogLog"):
+        if other.p != self.p:
+            raise ValueError("Cannot merge sketches with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        """Estimate from the register histogram (Ertl 2017, "improved raw estimator").
+
+        The classic raw estimate switched to linear counting at 2.5m, and is
+        biased by a few percent either side of that point. This estimator
+        folds the empty and saturated registers in through ``_sigma`` and
+        ``_tau`` and stays within the standard error over the whole range,
+        without HLL++'s empirical bias tables.
+        """
+        m = self.m
+        q = 64 - self.p
+        histogram = [0] * (q + 2)
+        for r in self.registers:
+            histogram[r] += 1
+        if histogram[0] == m:
+            return 0
+        z = m * _tau(1 - histogram[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + histogram[k])
+        z += m * _sigma(histogram[0] / m)
+        return int(round(m * m / (2 * math.log(2) * z)))
+
+    def to_bytes(self) -> bytes:
+        nonzero = [(i, r) for i, r in enumerate(self.registers) if r]
+        if len(nonzero) * 3 < self.m:
+            body = b"".join(struct.pack(">HB", i, r) for i, r in nonzero)
+            return bytes([SPARSE << 5 | self.p]) + body
+        return bytes([DENSE << 5 | self.p]) + bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        fmt, p = data[0] >> 5, data[0] & 0x1F
+        if fmt == DENSE:
+            return cls(p, bytearray(data[1:]))
+        sketch = cls(p)
+        registers = sketch.registers
+        for i, r in struct.iter_unpack(">HB", data[1:]):
+            registers[i] = r
+        return sketch
+
+    def merge_bytes(self, data: bytes):
+        """Merge a serialised sketch without building an intermediate object for sparse input."""
+        fmt, p = data[0] >> 5, data[0] & 0x1F
+        if p != self.p:
+            raise ValueError("Cannot merge sketches with different precision")
+        if fmt == DENSE:
+            self.registers = bytearray(map(max, self.registers, data[1:]))
+            return
+        registers = self.registers
+        for i, r in struct.iter_unpack(">HB", data[1:]):
+            if r > registers[i]:
+                registers[i] = r
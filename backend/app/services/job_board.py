@@ -0,0 +1,129 @@
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Job
+from app.schemas import JobResponse
+from app.services.job_queries import jobs_with_applicant_counts
+
+# Browsers revalidate every time (cheap with the ETag); shared caches such
+# as a CDN may serve the snapshot for up to a minute.
+CACHE_CONTROL = "public, max-age=0, s-maxage=60, must-revalidate"
+
+
+@dataclass(frozen=True)
+class JobBoardSnapshot:
+    body: bytes
+    etag: str
+    last_modified: datetime
+    built_at: float
+
+
+def build_snapshot(db: Session, previous: Optional[JobBoardSnapshot] = None) -> JobBoardSnapshot:
+    rows = (
+        jobs_with_applicant_counts(db)
+        .filter(Job.is_active == True)
+        .order_by(Job.created_at.desc())
+        .all()
+    )
+    payload = [JobResponse.from_orm_job(job, applicants).model_dump(mode="json") for job, applicants in rows]
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    # Last-Modified only moves when the content does; HTTP dates have one-second resolution
+    if previous is not None and previous.etag == etag:
+        last_modified = previous.last_modified
+    else:
+        last_modified = datetime.utcnow().replace(microsecond=0)
+    return JobBoardSnapshot(body=body, etag=etag, last_modified=last_modified, built_at=time.monotonic())
+
+
+class JobBoard:
+    """Pre-serialised public job listing, rebuilt when jobs change.
+
+    Writes in this process rebuild it immediately. ``max_age`` bounds how
+    stale it can get when another worker process made the change.
+    ``invalidate`` is called from the event loop, so it never waits on a
+    lock; the generation counter lets a rebuild that overlapped an
+    invalidation leave the board stale instead of marking it fresh.
+    """
+
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self._snapshot: Optional[JobBoardSnapshot] = None
+        self._stale = True
+        self._generation = 0
+        # Held only while swapping in a snapshot
+        self._lock = threading.Lock()
+        # Held while load() queries, so concurrent misses build once
+        self._build_lock = threading.Lock()
+
+    def current(self) -> Optional[JobBoardSnapshot]:
+        snapshot = self._snapshot
+        if snapshot is None or self._stale or time.monotonic() - snapshot.built_at > self.max_age:
+            return None
+        return snapshot
+
+    def _publish(self, snapshot: JobBoardSnapshot, generation: int):
+        with self._lock:
+            self._snapshot = snapshot
+            if self._generation == generation:
+                self._stale = False
+
+    def rebuild(self, db: Session) -> JobBoardSnapshot:
+        generation = self._generation
+        snapshot = build_snapshot(db, self._snapshot)
+        self._publish(snapshot, generation)
+        return snapshot
+
+    def load(self) -> JobBoardSnapshot:
+        with self._build_lock:
+            snapshot = self.current()
+            if snapshot is not None:
+                return snapshot
+            db = SessionLocal()
+            try:
+                return self.rebuild(db)
+            finally:
+                db.close()
+
+    def invalidate(self):
+        # Keep the old snapshot so an unchanged rebuild keeps its Last-Modified
+        self._generation += 1
+        self._stale = True
+
+
+def _not_modified(request: Request, snapshot: JobBoardSnapshot) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        return "*" in tags or snapshot.etag in tags or f"W/{snapshot.etag}" in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).replace(tzinfo=None)
+        except (TypeError, ValueError):
+            return False
+        return snapshot.last_modified <= since
+    return False
+
+
+def snapshot_response(request: Request, snapshot: JobBoardSnapshot) -> Response:
+    headers = {
+        "ETag": snapshot.etag,
+        "Last-Modified": format_datetime(snapshot.last_modified.replace(tzinfo=timezone.utc), usegmt=True),
+        "Cache-Control": CACHE_CONTROL,
+    }
+    if _not_modified(request, snapshot):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+job_board = JobBoard(max_age=settings.job_board_max_age_seconds)
@@ -0,0 +1,20 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models import Application, Job
+
+
+def jobs_with_applicant_counts(db: Session):
+    # Count applications per job in the database instead of loading them
+    counts = (
+        db.query(Application.job_id, func.count(Application.id).label("applicants"))
+        .group_by(Application.job_id)
+        .subquery()
+    )
+    return (
+        db.query(Job, func.coalesce(counts.c.applicants, 0))
+        .outerjoin(counts, counts.c.job_id == Job.id)
+    )
+
+
+def applicant_count(db: Session, job_id: int) -> int:
+    return db.query(func.count(Application.id)).filter(Application.job_id == job_id).scalar() or 0
@@ -0,0 +1,128 @@
+import asyncio
+import base64
+import glob
+import hashlib
+import os
+import threading
+import uuid
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.services.http_client import get_http_client
+
+SELECT_UPLOADS = text(
+    "SELECT id, original_name, file_type, url FROM newsletter_uploads WHERE id IN :ids"
+).bindparams(bindparam("ids", expanding=True))
+
+FETCH_CONCURRENCY = 4
+
+
+def load_uploads(db: Session, ids: Sequence[int]) -> Dict[int, tuple]:
+    """Fetch every selected upload row in one query, keyed by id."""
+    ids = list(dict.fromkeys(ids or []))
+    if not ids:
+        return {}
+    return {row[0]: row for row in db.execute(SELECT_UPLOADS, {"ids": ids})}
+
+
+class AssetCache:
+    """Base64 attachment payloads on local disk, keyed by upload id and ETag.
+
+    Entries are found by upload id alone, so a cached asset costs no network
+    round trip at all; the ETag in the name keeps a re-fetched, changed
+    object from being confused with the old one. Least recently used
+    entries (by mtime, refreshed on every hit) are evicted past ``max_bytes``.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _entries(self, upload_id: int) -> List[str]:
+        return glob.glob(os.path.join(self.directory, f"{upload_id}.*.b64"))
+
+    def get(self, upload_id: int) -> Optional[str]:
+        for path in self._entries(upload_id):
+            try:
+                with open(path, "r") as f:
+                    content = f.read()
+                os.utime(path)
+                return content
+            except FileNotFoundError:
+                continue
+        return None
+
+    def put(self, upload_id: int, etag: str, content: str):
+        os.makedirs(self.directory, exist_ok=True)
+        tag = hashlib.sha1(etag.encode()).hexdigest()[:16]
+        path = os.path.join(self.directory, f"{upload_id}.{tag}.b64")
+        tmp = os.path.join(self.directory, f".{uuid.uuid4().hex}")
+        with open(tmp, "w") as f:
+            f.write(content)
+        os.replace(tmp, path)
+        for stale in self._entries(upload_id):
+            if stale != path:
+                self._remove(stale)
+        self._evict()
+
+    def discard(self, upload_id: int):
+        for path in self._entries(upload_id):
+            self._remove(path)
+
+    def _remove(self, path: str):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for path in glob.glob(os.path.join(self.directory, "*.b64")):
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+
+asset_cache = AssetCache(settings.newsletter_asset_cache_dir, settings.newsletter_asset_cache_bytes)
+
+
+async def _download(url: str) -> Tuple[str, str]:
+    response = await get_http_client().get(url)
+    response.raise_for_status()
+    etag = response.headers.get("etag") or hashlib.sha256(response.content).hexdigest()
+    content = await asyncio.to_thread(lambda: base64.b64encode(response.content).decode())
+    return etag, content
+
+
+async def attachment_payloads(uploads: Dict[int, tuple], ids: Sequence[int]) -> List[dict]:
+    """Return ``{filename, content}`` for each id in order, downloading only what the cache lacks.
+
+    Misses are fetched concurrently; an attachment that cannot be fetched
+    is left out, as before.
+    """
+    ids = [i for i in dict.fromkeys(ids or []) if i in uploads]
+    cached = await asyncio.to_thread(lambda: {i: asset_cache.get(i) for i in ids})
+    semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+    async def fetch(upload_id: int):
+        async with semaphore:
+            try:
+                etag, content = await _download(uploads[upload_id][3])
+            except Exception:
+                return
+        await asyncio.to_thread(asset_cache.put, upload_id, etag, content)
+        cached[upload_id] = content
+
+    await asyncio.gather(*(fetch(i) for i in ids if cached[i] is None))
+    return [{"filename": uploads[i][1], "content": cached[i]} for i in ids if cached[i] is not None]
@@ -0,0 +1,293 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import bindparam, func, select, text, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models import NewsletterCampaign, NewsletterDelivery
+from app.services.email_delivery import (
+    DeliveryEngine, DeliveryResult, EncodedMessage, backoff_delay, batch_body, resend_engine
+)
+
+logger = logging.getLogger(__name__)
+
+NEWSLETTER_FROM = "Luton Friendship Homecarers <onboarding@resend.dev>"
+
+# "sending" rows are claimed by a worker until their next_attempt_at lease runs out
+OPEN_STATES = ("pending", "retrying", "sending")
+
+
+# ── Enqueue ────────────────────────────────────────────
+def create_campaign(db: Session, subject: str, message: str, html: str, attachments: list, attachment_info: list) -> NewsletterCampaign:
+    """Persist a campaign and one pending delivery per active subscriber. The caller commits."""
+    campaign = NewsletterCampaign(
+        subject=subject,
+        message=message,
+        html=html,
+        attachments=json.dumps(attachments),
+        attachment_info=json.dumps(attachment_info),
+        status="sending",
+    )
+    db.add(campaign)
+    db.flush()
+    result = db.execute(
+        text(
+            "INSERT INTO newsletter_deliveries (campaign_id, email, status, attempts, next_attempt_at, updated_at) "
+            "SELECT :campaign_id, email, 'pending', 0, :now, :now FROM newsletter_subscribers WHERE is_active = TRUE"
+        ),
+        {"campaign_id": campaign.id, "now": datetime.utcnow()},
+    )
+    campaign.total = result.rowcount
+    return campaign
+
+
+def campaign_progress(db: Session, campaign_id: int) -> Optional[dict]:
+    campaign = db.get(NewsletterCampaign, campaign_id)
+    if campaign is None:
+        return None
+    counts = dict(
+        db.query(NewsletterDelivery.status, func.count())
+        .filter(NewsletterDelivery.campaign_id == campaign_id)
+        .group_by(NewsletterDelivery.status)
+        .all()
+    )
+    return {
+        "id": campaign.id,
+        "subject": campaign.subject,
+        "status": campaign.status,
+        "total": campaign.total,
+        "pending": counts.get("pending", 0),
+        "retrying": counts.get("retrying", 0),
+        "sending": counts.get("sending", 0),
+        "sent": counts.get("sent", 0),
+        "failed": counts.get("failed", 0),
+        "created_at": campaign.created_at,
+        "completed_at": campaign.completed_at,
+    }
+
+
+# ── Drain ──────────────────────────────────────────────
+def claim_deliveries(db: Session, limit: int) -> list:
+    """Lease up to ``limit`` due deliveries to this worker. The caller commits.
+
+    Claimed rows move to ``sending`` with ``next_attempt_at`` pushed out by
+    the lease, so once committed no other worker picks them up while they
+    are being sent, without any lock held during the send. If the worker
+    dies mid-batch the lease runs out and the rows are claimed again.
+    ``SKIP LOCKED`` keeps concurrent claims off each other's rows.
+    """
+    now = datetime.utcnow()
+    due = (
+        select(NewsletterDelivery.id)
+        .where(NewsletterDelivery.status.in_(OPEN_STATES), NewsletterDelivery.next_attempt_at <= now)
+        .order_by(NewsletterDelivery.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    rows = db.execute(
+        update(NewsletterDelivery)
+        .where(NewsletterDelivery.id.in_(due.scalar_subquery()))
+        .values(status="sending", next_attempt_at=now + timedelta(seconds=settings.newsletter_lease_seconds), updated_at=now)
+        .returning(NewsletterDelivery.id, NewsletterDelivery.campaign_id, NewsletterDelivery.email, NewsletterDelivery.attempts)
+        .execution_options(synchronize_session=False)
+    ).all()
+    return sorted(rows, key=lambda row: row.id)
+
+
+def record_results(db: Session, claimed: list, results: List[DeliveryResult]):
+    now = datetime.utcnow()
+    sent, retrying, failed = [], [], []
+    for row, result in zip(claimed, results):
+        attempts = row.attempts + 1
+        params = {"d_id": row.id, "attempts": attempts, "error": (result.error or "")[:500] or None}
+        if result.ok:
+            sent.append(params)
+        elif result.retryable and attempts < settings.newsletter_max_attempts:
+            params["next_attempt_at"] = now + timedelta(seconds=backoff_delay(attempts, 30, 3600))
+            retrying.append(params)
+        else:
+            failed.append(params)
+
+    table = NewsletterDelivery.__table__
+    match = table.c.id == bindparam("d_id")
+    if sent:
+        db.execute(update(table).where(match).values(status="sent", attempts=bindparam("attempts"), last_error=None, sent_at=now, updated_at=now), sent)
+    if retrying:
+        db.execute(update(table).where(match).values(status="retrying", attempts=bindparam("attempts"), last_error=bindparam("error"), next_attempt_at=bindparam("next_attempt_at"), updated_at=now), retrying)
+    if failed:
+        db.execute(update(table).where(match).values(status="failed", attempts=bindparam("attempts"), last_error=bindparam("error"), updated_at=now), failed)
+
+
+def complete_campaigns(db: Session, campaign_ids) -> List[int]:
+    """Close campaigns with no open deliveries left and add them to newsletter_history."""
+    open_deliveries = (
+        select(NewsletterDelivery.id)
+        .where(NewsletterDelivery.campaign_id == NewsletterCampaign.id, NewsletterDelivery.status.in_(OPEN_STATES))
+        .exists()
+    )
+    # Only one worker's UPDATE matches a given campaign, so history is written once
+    finished = db.execute(
+        update(NewsletterCampaign)
+        .where(NewsletterCampaign.id.in_(list(campaign_ids)), NewsletterCampaign.status == "sending", ~open_deliveries)
+        .values(status="completed", completed_at=datetime.utcnow())
+        .returning(NewsletterCampaign.id, NewsletterCampaign.subject, NewsletterCampaign.message, NewsletterCampaign.attachment_info)
+    ).all()
+    for campaign_id, subject, message, attachment_info in finished:
+        counts = dict(
+            db.query(NewsletterDelivery.status, func.count())
+            .filter(NewsletterDelivery.campaign_id == campaign_id)
+            .group_by(NewsletterDelivery.status)
+            .all()
+        )
+        db.execute(
+            text("INSERT INTO newsletter_history (subject, message, sent_to, failed, attachments) VALUES (:subject, :message, :sent_to, :failed, :attachments)"),
+            {"subject": subject, "message": message, "sent_to": counts.get("sent", 0), "failed": counts.get("failed", 0), "attachments": attachment_info},
+        )
+    return [row[0] for row in finished]
+
+
+class OutboxWorker:
+    """Drains newsletter deliveries in the background, one leased batch at a time.
+
+    Each batch takes two short transactions: one to claim the rows, one to
+    record the results. Nothing is held open while the provider is called.
+    Any number of workers, in this process or others, can drain the same
+    outbox.
+    """
+
+    def __init__(self, batch_size: int, poll_interval: float):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._engine: Optional[DeliveryEngine] = None
+        self._campaigns: Dict[int, EncodedMessage] = {}
+
+    def start(self):
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self):
+        self._wake.set()
+
+    async def _run(self):
+        while True:
+            try:
+                drained = await self.drain_once()
+            except Exception as e:
+                logger.error(f"Newsletter outbox batch failed: {e}")
+                drained = 0
+            if drained:
+                continue
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _message(self, db: Session, campaign_id: int) -> EncodedMessage:
+        message = self._campaigns.get(campaign_id)
+        if message is None:
+            if len(self._campaigns) >= 16:
+                self._campaigns.clear()
+            campaign = db.get(NewsletterCampaign, campaign_id)
+            fields = {"from": NEWSLETTER_FROM, "subject": campaign.subject, "html": campaign.html}
+            attachments = json.loads(campaign.attachments or "[]")
+            if attachments:
+                fields["attachments"] = attachments
+            message = self._campaigns[campaign_id] = EncodedMessage(fields)
+        return message
+
+    async def drain_once(self) -> int:
+        if self._engine is None:
+            self._engine = resend_engine(max_retries=1)
+            if self._engine is None:
+                return 0
+
+        db = SessionLocal()
+        try:
+            claimed, messages = await asyncio.to_thread(self._claim, db)
+            if not claimed:
+                return 0
+            results = await self._send(claimed, messages)
+            await asyncio.to_thread(self._finish, db, claimed, results, list(messages))
+            return len(claimed)
+        except BaseException:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _claim(self, db: Session):
+        claimed = claim_deliveries(db, self.batch_size)
+        messages = {campaign_id: self._message(db, campaign_id) for campaign_id in {row.campaign_id for row in claimed}}
+        db.commit()
+        return claimed, messages
+
+    async def _send(self, claimed: list, messages: Dict[int, EncodedMessage]) -> List[DeliveryResult]:
+        """Group batchable campaigns into provider batch calls and send the rest one by one."""
+        batched: Dict[int, list] = {}
+        singles = []
+        for index, row in enumerate(claimed):
+            if messages[row.campaign_id].batchable:
+                batched.setdefault(row.campaign_id, []).append(index)
+            else:
+                singles.append(index)
+
+        batch_indexes = []
+        for campaign_id, indexes in batched.items():
+            for i in range(0, len(indexes), settings.email_batch_size):
+                batch_indexes.append(indexes[i:i + settings.email_batch_size])
+        batches = [
+            (
+                [claimed[i].email for i in indexes],
+                batch_body([messages[claimed[i].campaign_id].for_recipient(claimed[i].email) for i in indexes]),
+            )
+            for indexes in batch_indexes
+        ]
+        single_messages = [
+            (claimed[i].email, messages[claimed[i].campaign_id].for_recipient(claimed[i].email)) for i in singles
+        ]
+
+        batch_results, single_results = await asyncio.gather(
+            self._engine.send_batches(batches), self._engine.send_all(single_messages)
+        )
+        results: List[Optional[DeliveryResult]] = [None] * len(claimed)
+        for indexes, batch in zip(batch_indexes, batch_results):
+            # One invalid address rejects the whole batch; resend those individually
+            if not batch[0].ok and not batch[0].retryable:
+                singles.extend(indexes)
+                single_results += await self._engine.send_all(
+                    [(claimed[i].email, messages[claimed[i].campaign_id].for_recipient(claimed[i].email)) for i in indexes]
+                )
+                continue
+            for i, result in zip(indexes, batch):
+                results[i] = result
+        for i, result in zip(singles, single_results):
+            results[i] = result
+        return results
+
+    def _finish(self, db: Session, claimed: list, results: List[DeliveryResult], campaign_ids: list):
+        record_results(db, claimed, results)
+        for campaign_id in complete_campaigns(db, campaign_ids):
+            self._campaigns.pop(campaign_id, None)
+        db.commit()
+
+
+outbox_worker = OutboxWorker(
+    batch_size=settings.newsletter_batch_size,
+    poll_interval=settings.newsletter_poll_interval_seconds,
+)
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+import httpx
+from app.config import settings
+from app.services.email_delivery import RESEND_EMAILS_URL, DeliveryEngine, resend_engine
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_FROM = "onboarding@resend.dev"
+
+
+@dataclass(frozen=True)
+class Notification:
+    to: str
+    subject: str
+    html: str
+    sender: str = NOTIFICATION_FROM
+
+    def payload(self) -> dict:
+        return {"from": self.sender, "to": [self.to], "subject": self.subject, "html": self.html}
+
+
+class NotificationDispatcher:
+    """Hands transactional emails to background workers so routes never wait on the provider.
+
+    ``send`` only enqueues and may be called from the event loop or from a
+    threadpool route. The queue is bounded; when it is full the message is
+    dropped and counted rather than stalling the request. Delivery goes
+    through a DeliveryEngine on the shared HTTP client, with a per-call
+    timeout and retries on 429/5xx.
+    """
+
+    def __init__(self, max_queue: int, workers: int, timeout: float, max_retries: int):
+        self.max_queue = max_queue
+        self.workers = workers
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self.queued = 0
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def start(self):
+        if self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, drain_timeout: float = 10.0):
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {self._queue.qsize()} unsent notification(s) on shutdown")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+
+    def send(self, to: str, subject: str, html: str) -> bool:
+        notification = Notification(to=to, subject=subject, html=html)
+        loop = self._loop
+        if loop is None:
+            # Not running inside the app (e.g. a script): fall back to a direct call
+            return self._send_now(notification)
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            return self._enqueue(notification)
+        # Called from a threadpool route; asyncio.Queue is not thread-safe
+        loop.call_soon_threadsafe(self._enqueue, notification)
+        return True
+
+    def _enqueue(self, notification: Notification) -> bool:
+        try:
+            self._queue.put_nowait(notification)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Notification queue full, dropped email to {notification.to}")
+            return False
+        self.queued += 1
+        return True
+
+    def _engine(self) -> Optional[DeliveryEngine]:
+        return resend_engine(concurrency=1, max_retries=self.max_retries, timeout=self.timeout)
+
+    async def _worker(self):
+        engine = self._engine()
+        while True:
+            notification = await self._queue.get()
+            try:
+                if engine is None:
+                    engine = self._engine()
+                if engine is None:
+                    self.failed += 1
+                    continue
+                result = await engine.post(notification.to, notification.payload())
+                if result.ok:
+                    self.sent += 1
+                else:
+                    self.failed += 1
+                    logger.warning(f"Email to {notification.to} failed after {result.attempts} attempt(s): {result.error}")
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Email to {notification.to} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _send_now(self, notification: Notification) -> bool:
+        engine = self._engine()
+        if engine is None:
+            return False
+        try:
+            response = httpx.post(RESEND_EMAILS_URL, headers=engine.headers, json=notification.payload(), timeout=self.timeout)
+            return response.status_code < 300
+        except httpx.HTTPError as e:
+            logger.error(f"Email to {notification.to} failed: {e}")
+            return False
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queued,
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+
+notifications = NotificationDispatcher(
+    max_queue=settings.notification_queue_size,
+    workers=settings.notification_workers,
+    timeout=settings.notification_timeout_seconds,
+    max_retries=settings.notification_max_retries,
+)
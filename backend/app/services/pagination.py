@@ -0,0 +1,90 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+MAX_PAGE_SIZE = 500
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+@dataclass
+class Page:
+    rows: List[Any]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    raw = json.dumps([sort_value.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_order(query: Query, sort_column, id_column, descending: bool = True) -> Query:
+    if descending:
+        return query.order_by(sort_column.desc(), id_column.desc())
+    return query.order_by(sort_column.asc(), id_column.asc())
+
+
+def keyset_page(
+    query: Query,
+    sort_column,
+    id_column,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    descending: bool = True,
+    include_total: bool = False,
+) -> Page:
+    """Page through ``query`` ordered by (sort_column, id_column).
+
+    Each page seeks past the last row of the previous one with a row-value
+    comparison, so with a matching composite index the cost of a page does
+    not grow with its position or the table size. ``limit=None`` returns
+    every row, which keeps unpaginated callers working.
+    """
+    total = None
+    if include_total and (limit is not None or cursor):
+        total = query.order_by(None).count()
+
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        key = tuple_(sort_column, id_column)
+        after = tuple_(sort_value, last_id)
+        query = query.filter(key < after if descending else key > after)
+
+    query = keyset_order(query, sort_column, id_column, descending)
+
+    if limit is None:
+        rows = query.all()
+        if include_total and total is None:
+            total = len(rows)
+        return Page(rows=rows, total=total)
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return Page(rows=rows, next_cursor=next_cursor, total=total)
+
+
+def set_page_headers(response: Response, page: Page):
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if page.total is not None:
+        response.headers[TOTAL_COUNT_HEADER] = str(page.total)
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from app.config import settings
+from app.services.auth_service import verify_password, get_password_hash
+
+
+class HashExecutor:
+    """A small dedicated pool for bcrypt so hashing never occupies the shared threadpool.
+
+    bcrypt releases the GIL while it works, so threads are enough. At most
+    ``max_queue`` calls may wait for a worker; beyond that callers get a 503
+    immediately instead of piling up behind a burst of logins.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.run_seconds_total = 0.0
+
+    def _call(self, fn, args, submitted: float):
+        started = time.perf_counter()
+        wait = started - submitted
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.run_seconds_total += time.perf_counter() - started
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Server busy, please try again shortly", headers={"Retry-After": "1"})
+            self.queued += 1
+        future = self._executor.submit(self._call, fn, args, time.perf_counter())
+        future.add_done_callback(self._release_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def _release_cancelled(self, future):
+        # A waiter cancelled before a worker picked the call up; _call never runs
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.wait_seconds_total / completed * 1000, 1),
+                "max_wait_ms": round(self.wait_seconds_max * 1000, 1),
+                "avg_hash_ms": round(self.run_seconds_total / completed * 1000, 1),
+            }
+
+
+hash_executor = HashExecutor(workers=settings.password_hash_workers, max_queue=settings.password_hash_max_queue)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hash_executor.run(verify_password, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    return await hash_executor.run(get_password_hash, password)
@@ -0,0 +1,54 @@
+import math
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+from fastapi import HTTPException
+
+
+class SlidingWindowLimiter:
+    """Allow at most ``limit`` hits per key in any ``window`` seconds (sliding log)."""
+
+    def __init__(self, limit: int, window: float, max_keys: int = 10000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._hits: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key: str) -> Optional[float]:
+        """Record a hit; return None if allowed, else the seconds until the key may try again."""
+        now = time.monotonic()
+        cutoff = now - self.window
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits is None:
+                if len(self._hits) >= self.max_keys:
+                    self._prune(cutoff)
+                hits = self._hits[key] = deque()
+            while hits and hits[0] <= cutoff:
+                hits.popleft()
+            if len(hits) >= self.limit:
+                return hits[0] - cutoff
+            hits.append(now)
+            return None
+
+    def reset(self, key: str):
+        with self._lock:
+            self._hits.pop(key, None)
+
+    def _prune(self, cutoff: float):
+        for key in [k for k, hits in self._hits.items() if not hits or hits[-1] <= cutoff]:
+            del self._hits[key]
+
+
+def enforce(*checks: Tuple[SlidingWindowLimiter, str]):
+    """Raise 429 if any ``(limiter, key)`` is over its limit; every key is counted either way."""
+    waits = [limiter.hit(key) for limiter, key in checks]
+    retry_after = max((wait for wait in waits if wait is not None), default=None)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many attempts, please try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
@@ -0,0 +1,206 @@
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.services.hll import HyperLogLog
+
+logger = logging.getLogger(__name__)
+
+WATERMARK = "tracking_daily"
+
+# Days folded into the rollups per transaction while catching up on history
+CHUNK_DAYS = 31
+
+# Closed days folded again on every run, to pick up session ends and
+# PATCH /session updates that arrive after midnight for the day before
+LOOKBACK_DAYS = 1
+
+ROLLUP_VISITS_SQL = text("""
+    INSERT INTO visit_daily_rollups (day, source, device, visits, bounces, duration_sum, duration_count)
+    SELECT DATE(visited_at), COALESCE(referrer, ''), COALESCE(device, ''),
+           COUNT(*),
+           COUNT(*) FILTER (WHERE bounced = TRUE),
+           COALESCE(SUM(duration_seconds) FILTER (WHERE duration_seconds > 0), 0),
+           COUNT(*) FILTER (WHERE duration_seconds > 0)
+    FROM site_visits
+    WHERE visited_at >= :a AND visited_at < :b
+    GROUP BY 1, 2, 3
+    ON CONFLICT (day, source, device) DO UPDATE SET
+        visits = EXCLUDED.visits,
+        bounces = EXCLUDED.bounces,
+        duration_sum = EXCLUDED.duration_sum,
+        duration_count = EXCLUDED.duration_count
+""")
+
+# Views and unique sessions come from page_views; bounces and time on site
+# are attributed to the page a visit landed on.
+ROLLUP_PAGES_SQL = text("""
+    INSERT INTO page_daily_rollups (day, page, views, unique_sessions, bounces, duration_sum)
+    SELECT day, page, SUM(views), SUM(unique_sessions), SUM(bounces), SUM(duration_sum)
+    FROM (
+        SELECT DATE(viewed_at) AS day, page,
+               COUNT(*) AS views, COUNT(DISTINCT session_id) AS unique_sessions,
+               0 AS bounces, 0 AS duration_sum
+        FROM page_views
+        WHERE viewed_at >= :a AND viewed_at < :b
+        GROUP BY 1, 2
+        UNION ALL
+        SELECT DATE(visited_at), landing_page,
+               0, 0,
+               COUNT(*) FILTER (WHERE bounced = TRUE),
+               COALESCE(SUM(duration_seconds), 0)
+        FROM site_visits
+        WHERE visited_at >= :a AND visited_at < :b AND landing_page IS NOT NULL
+        GROUP BY 1, 2
+    ) t
+    GROUP BY day, page
+    ON CONFLICT (day, page) DO UPDATE SET
+        views = EXCLUDED.views,
+        unique_sessions = EXCLUDED.unique_sessions,
+        bounces = EXCLUDED.bounces,
+        duration_sum = EXCLUDED.duration_sum
+""")
+
+
+PAGE_SESSIONS_SQL = text("""
+    SELECT DISTINCT DATE(viewed_at) AS day, page, session_id
+    FROM page_views
+    WHERE viewed_at >= :a AND viewed_at < :b
+""")
+
+STORE_PAGE_SKETCH_SQL = text(
+    "UPDATE page_daily_rollups SET sessions_hll = :sketch WHERE day = :day AND page = :page"
+)
+
+
+def _store_page_sketches(db: Session, bounds: dict):
+    sketches = {}
+    rows = db.execute(PAGE_SESSIONS_SQL, bounds, execution_options={"stream_results": True})
+    for day, page, session_id in rows:
+        sketch = sketches.get((day, page))
+        if sketch is None:
+            sketch = sketches[(day, page)] = HyperLogLog()
+        sketch.add(session_id)
+    if sketches:
+        db.execute(STORE_PAGE_SKETCH_SQL, [
+            {"day": day, "page": page, "sketch": sketch.to_bytes()}
+            for (day, page), sketch in sketches.items()
+        ])
+
+
+def _midnight(d: date) -> datetime:
+    return datetime(d.year, d.month, d.day)
+
+
+def rollup_watermark(db: Session) -> Optional[date]:
+    """First day that is not yet covered by the rollup tables."""
+    return db.execute(
+        text("SELECT rolled_until FROM rollup_watermarks WHERE name = :n"), {"n": WATERMARK}
+    ).scalar()
+
+
+def _first_raw_day(db: Session) -> Optional[date]:
+    first = db.execute(text("""
+        SELECT LEAST(
+            (SELECT MIN(visited_at) FROM site_visits),
+            (SELECT MIN(viewed_at) FROM page_views)
+        )
+    """)).scalar()
+    return first.date() if first else None
+
+
+def roll_up(db: Session, today: Optional[date] = None) -> int:
+    """Fold closed days newer than the watermark into the rollup tables.
+
+    Works through history in chunks of CHUNK_DAYS, committing after each so
+    a first run on a large table does not hold one long transaction. The
+    watermark row is locked so concurrent workers do not duplicate work.
+    The first chunk of each run starts LOOKBACK_DAYS before the watermark;
+    the upserts replace rather than add, so re-folding a day is safe.
+    Returns the number of new days rolled up.
+    """
+    today = today or datetime.utcnow().date()
+    rolled = 0
+    lookback = timedelta(days=LOOKBACK_DAYS)
+    while True:
+        start = db.execute(
+            text("SELECT rolled_until FROM rollup_watermarks WHERE name = :n FOR UPDATE"), {"n": WATERMARK}
+        ).scalar()
+        if start is None:
+            start = _first_raw_day(db)
+            if start is None:
+                db.rollback()
+                return rolled
+            db.execute(
+                text("""INSERT INTO rollup_watermarks (name, rolled_until, updated_at) VALUES (:n, :d, :now)
+                        ON CONFLICT (name) DO NOTHING"""),
+                {"n": WATERMARK, "d": start, "now": datetime.utcnow()},
+            )
+            db.commit()
+            continue
+
+        end = min(start + timedelta(days=CHUNK_DAYS), today)
+        fold_from = start - lookback
+        lookback = timedelta(0)
+        if fold_from >= end:
+            db.rollback()
+            return rolled
+
+        bounds = {"a": _midnight(fold_from), "b": _midnight(end)}
+        db.execute(ROLLUP_VISITS_SQL, bounds)
+        db.execute(ROLLUP_PAGES_SQL, bounds)
+        _store_page_sketches(db, bounds)
+        db.execute(
+            text("UPDATE rollup_watermarks SET rolled_until = :d, updated_at = :now WHERE name = :n"),
+            {"n": WATERMARK, "d": end, "now": datetime.utcnow()},
+        )
+        db.commit()
+        rolled += (end - start).days
+
+
+class RollupWorker:
+    """Runs the incremental aggregator on a fixed interval in the background."""
+
+    def __init__(self, interval_seconds: int):
+        self.interval = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                days = await asyncio.to_thread(self._roll_up)
+                if days:
+                    logger.info(f"Rolled up {days} day(s) of tracking data")
+            except Exception as e:
+                logger.error(f"Tracking rollup failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def _roll_up(self) -> int:
+        db = SessionLocal()
+        try:
+            return roll_up(db)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+rollup_worker = RollupWorker(interval_seconds=settings.rollup_interval_seconds)
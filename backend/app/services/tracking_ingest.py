@@ -0,0 +1,256 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+from sqlalchemy import column, table, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import InterfaceError, OperationalError
+from app.config import settings
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("drop", "block")
+
+
+@dataclass(frozen=True)
+class PageViewEvent:
+    page: str
+    referrer: str
+    device: str
+    browser: str
+    session_id: str
+    source: str
+    landing_page: str
+
+
+@dataclass(frozen=True)
+class SessionStartEvent:
+    session_id: str
+    device: str
+    browser: str
+    source: str
+    landing_page: Optional[str]
+
+
+@dataclass(frozen=True)
+class SessionEndEvent:
+    session_id: str
+    duration: int
+    bounced: bool
+
+
+# The raw tracking tables as Core constructs; batched writes go through
+# insert() so SQLAlchemy folds each batch into multi-row VALUES statements
+page_views_table = table(
+    "page_views",
+    column("page"), column("referrer"), column("device"), column("browser"), column("session_id"),
+)
+site_visits_table = table(
+    "site_visits",
+    column("session_id"), column("device"), column("browser"), column("referrer"), column("landing_page"),
+)
+
+INSERT_PAGE_VIEWS = insert(page_views_table)
+
+INSERT_SITE_VISITS = insert(site_visits_table).on_conflict_do_nothing(index_elements=["session_id"])
+
+UPDATE_SITE_VISITS = text(
+    "UPDATE site_visits SET duration_seconds = :d, bounced = :b WHERE session_id = :s"
+)
+
+# Every session end of a batch in one statement, passed as three parallel arrays
+UPDATE_SITE_VISITS_MANY = text("""
+    UPDATE site_visits v SET duration_seconds = e.d, bounced = e.b
+    FROM unnest(CAST(:s AS text[]), CAST(:d AS integer[]), CAST(:b AS boolean[])) AS e(s, d, b)
+    WHERE v.session_id = e.s
+""")
+
+
+def write_tracking_batch(
+    db,
+    page_views: List[PageViewEvent],
+    session_starts: List[SessionStartEvent] = (),
+    session_ends: List[SessionEndEvent] = (),
+):
+    """Write a batch of tracking events in at most one statement per table and kind.
+
+    The inserts run as insertmanyvalues (multi-row VALUES) and session ends
+    as one UPDATE over unnested arrays, so a batch costs a few round trips
+    however many events it holds. Visits are
+    inserted before session ends are applied so a batch can open and
+    close the same session. The caller owns the transaction.
+    """
+    if page_views:
+        db.execute(INSERT_PAGE_VIEWS, [
+            {"page": e.page, "referrer": e.referrer, "device": e.device, "browser": e.browser, "session_id": e.session_id}
+            for e in page_views
+        ])
+
+    # Only the first event of a session can create its visit row; a start
+    # without a landing page takes it from the session's page views
+    visits = {}
+    for e in list(session_starts) + list(page_views):
+        visit = visits.get(e.session_id)
+        if visit is None:
+            visits[e.session_id] = {
+                "session_id": e.session_id, "device": e.device, "browser": e.browser,
+                "referrer": e.source, "landing_page": e.landing_page,
+            }
+        elif visit["landing_page"] is None:
+            visit["landing_page"] = e.landing_page
+    if visits:
+        db.execute(INSERT_SITE_VISITS, list(visits.values()))
+
+    # Later ends for the same session supersede earlier ones
+    ends = {e.session_id: e for e in session_ends}
+    if ends:
+        db.execute(UPDATE_SITE_VISITS_MANY, {
+            "s": list(ends),
+            "d": [e.duration for e in ends.values()],
+            "b": [e.bounced for e in ends.values()],
+        })
+
+
+class TrackingIngestBuffer:
+    """Bounded in-process queue of page views, drained in batches by a background task."""
+
+    def __init__(self, max_size: int, flush_interval_ms: int, flush_batch_size: int, overflow_policy: str = "drop"):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        self.max_size = max_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_batch_size = flush_batch_size
+        self.overflow_policy = overflow_policy
+        self.queued = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    async def put(self, event: PageViewEvent) -> bool:
+        if self.overflow_policy == "block":
+            await self._queue.put(event)
+        else:
+            try:
+                self._queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                return False
+        self.queued += 1
+        return True
+
+    def start(self):
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Signal rather than cancel, so the batch being collected is flushed
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        # Flush whatever is still queued before the worker exits
+        while not self._queue.empty():
+            await self._flush(self._drain(self.flush_batch_size))
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queued,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "pending": self._queue.qsize(),
+            "capacity": self.max_size,
+            "overflow_policy": self.overflow_policy,
+        }
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            batch = await self._collect()
+            if batch:
+                await self._flush(batch)
+
+    async def _next(self, timeout: Optional[float] = None) -> Optional[PageViewEvent]:
+        """The next queued event, or None on timeout or once stop() is called."""
+        get = asyncio.ensure_future(self._queue.get())
+        stopping = asyncio.ensure_future(self._stopping.wait())
+        await asyncio.wait({get, stopping}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        stopping.cancel()
+        # cancel() fails only if the get already finished, and then the event is ours
+        if not get.cancel():
+            return get.result()
+        return None
+
+    async def _collect(self) -> List[PageViewEvent]:
+        loop = asyncio.get_running_loop()
+        first = await self._next()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.flush_batch_size:
+            batch.extend(self._drain(self.flush_batch_size - len(batch)))
+            remaining = deadline - loop.time()
+            if len(batch) >= self.flush_batch_size or remaining <= 0:
+                break
+            event = await self._next(remaining)
+            if event is None:
+                break
+            batch.append(event)
+        return batch
+
+    def _drain(self, limit: int) -> List[PageViewEvent]:
+        items = []
+        while len(items) < limit:
+            try:
+                items.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return items
+
+    async def _flush(self, batch: List[PageViewEvent], retry: bool = True):
+        try:
+            await asyncio.to_thread(self._write, batch)
+            self.flushed += len(batch)
+            return
+        except (OperationalError, InterfaceError) as e:
+            # The database is unreachable; splitting the batch would not help
+            if retry:
+                return await self._flush(batch, retry=False)
+            self.failed += len(batch)
+            logger.error(f"Tracking flush of {len(batch)} events failed: {e}")
+            return
+        except Exception as e:
+            if retry:
+                return await self._flush(batch, retry=False)
+            if len(batch) == 1:
+                self.failed += 1
+                logger.error(f"Dropping tracking event that cannot be written: {e}")
+                return
+        # Bisect so one bad row does not cost the rest of the batch
+        middle = len(batch) // 2
+        await self._flush(batch[:middle], retry=False)
+        await self._flush(batch[middle:], retry=False)
+
+    def _write(self, batch: List[PageViewEvent]):
+        db = SessionLocal()
+        try:
+            write_tracking_batch(db, batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+ingest_buffer = TrackingIngestBuffer(
+    max_size=settings.tracking_queue_size,
+    flush_interval_ms=settings.tracking_flush_interval_ms,
+    flush_batch_size=settings.tracking_flush_batch_size,
+    overflow_policy=settings.tracking_overflow_policy,
+)
@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO, Tuple
+from fastapi import HTTPException, UploadFile
+from app.services.cv_store import put_blob, temp_path
+
+CHUNK_SIZE = 64 * 1024
+
+# Leading bytes of each accepted CV format. DOCX is a ZIP container and the
+# legacy DOC format is an OLE2 compound file.
+CV_SIGNATURES = (
+    (b"%PDF-", ".pdf", "application/pdf"),
+    (b"PK\x03\x04", ".docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", ".doc", "application/msword"),
+)
+
+
+@dataclass
+class SavedUpload:
+    relpath: str
+    ext: str
+    media_type: str
+    size: int
+    sha256: str
+
+
+def sniff_cv_type(head: bytes):
+    for signature, ext, media_type in CV_SIGNATURES:
+        if head.startswith(signature):
+            return ext, media_type
+    return None
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"CV must be at most {max_bytes // (1024 * 1024)} MB")
+
+
+def _copy(src: BinaryIO, dest: BinaryIO, max_bytes: int, first: bytes, digest) -> int:
+    size = len(first)
+    dest.write(first)
+    digest.update(first)
+    while True:
+        chunk = src.read(CHUNK_SIZE)
+        if not chunk:
+            return size
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLarge()
+        dest.write(chunk)
+        digest.update(chunk)
+
+
+def _save_cv(src: BinaryIO, directory: str, max_bytes: int) -> SavedUpload:
+    first = src.read(CHUNK_SIZE)
+    if not first:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty")
+    if len(first) > max_bytes:
+        raise _too_large(max_bytes)
+    sniffed = sniff_cv_type(first)
+    if sniffed is None:
+        raise HTTPException(status_code=400, detail="Only PDF, DOC, and DOCX files are allowed")
+    ext, media_type = sniffed
+
+    digest = hashlib.sha256()
+    tmp = temp_path(directory)
+    try:
+        with open(tmp, "wb") as dest:
+            size = _copy(src, dest, max_bytes, first, digest)
+        relpath = put_blob(directory, tmp, digest.hexdigest(), ext)
+    except UploadTooLarge:
+        os.unlink(tmp)
+        raise _too_large(max_bytes)
+    except Exception:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return SavedUpload(relpath=relpath, ext=ext, media_type=media_type, size=size, sha256=digest.hexdigest())
+
+
+def _spool(src: BinaryIO, suffix: str) -> Tuple[str, int]:
+    size = 0
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        try:
+            while True:
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk:
+                    return tmp.name, size
+                tmp.write(chunk)
+                size += len(chunk)
+        except Exception:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+
+
+async def spool_to_temp(upload: UploadFile, suffix: str = "") -> Tuple[str, int]:
+    """Copy an upload to a named temp file in chunks on a worker thread; the caller deletes it."""
+    return await asyncio.to_thread(_spool, upload.file, suffix)
+
+
+async def save_cv(upload: UploadFile, directory: str, max_bytes: int) -> SavedUpload:
+    """Stream an uploaded CV into the content-addressed store under ``directory``.
+
+    The copy runs in fixed-size chunks on a worker thread, hashing as it
+    goes. The file type comes from the leading bytes rather than the
+    client's filename, and the copy stops as soon as ``max_bytes`` is exceeded.
+    """
+    # The multipart parser records the size; refuse oversized files before copying anything
+    if upload.size is not None and upload.size > max_bytes:
+        raise _too_large(max_bytes)
+    return await asyncio.to_thread(_save_cv, upload.file, directory, max_bytes)
@@ -11,8 +11,8 @@ from app.config import settings
 
 config = context.config
 
-# Override the sqlalchemy.url with the correct driver URL (psycopg instead of postgresql)
-database_url = settings.database_url.replace('postgresql://', 'postgresql+psycopg://')
+# Same driver as the app (psycopg2-binary is what's installed)
+database_url = settings.database_url.replace('postgresql://', 'postgresql+psycopg2://')
 config.set_main_option("sqlalchemy.url", database_url.replace('%', '%%'))
 
 if config.config_file_name is not None:
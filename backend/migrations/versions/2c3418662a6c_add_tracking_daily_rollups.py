@@ -0,0 +1,56 @@
+"""add_tracking_daily_rollups
+
+Revision ID: 2c3418662a6c
+Revises: f2ff08be755a
+Create Date: 2026-10-18 09:05:12.418305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c3418662a6c'
+down_revision = 'f2ff08be755a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('visit_daily_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('source', sa.String(length=100), nullable=False),
+    sa.Column('device', sa.String(length=50), nullable=False),
+    sa.Column('visits', sa.Integer(), nullable=False),
+    sa.Column('bounces', sa.Integer(), nullable=False),
+    sa.Column('duration_sum', sa.BigInteger(), nullable=False),
+    sa.Column('duration_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'source', 'device')
+    )
+    op.create_table('page_daily_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('page', sa.String(length=500), nullable=False),
+    sa.Column('views', sa.Integer(), nullable=False),
+    sa.Column('unique_sessions', sa.Integer(), nullable=False),
+    sa.Column('bounces', sa.Integer(), nullable=False),
+    sa.Column('duration_sum', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'page')
+    )
+    op.create_table('rollup_watermarks',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('rolled_until', sa.Date(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # The raw tracking tables are created outside of the ORM; the rollup
+    # aggregator and the partial-day scans rely on these range indexes.
+    op.execute("CREATE INDEX IF NOT EXISTS ix_site_visits_visited_at ON site_visits (visited_at)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_page_views_viewed_at ON page_views (viewed_at)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_page_views_viewed_at")
+    op.execute("DROP INDEX IF EXISTS ix_site_visits_visited_at")
+    op.drop_table('rollup_watermarks')
+    op.drop_table('page_daily_rollups')
+    op.drop_table('visit_daily_rollups')
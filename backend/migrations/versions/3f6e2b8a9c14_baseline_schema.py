@@ -0,0 +1,191 @@
+"""baseline_schema
+
+Revision ID: 3f6e2b8a9c14
+Revises: 
+Create Date: 2026-10-18 17:20:11.604318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6e2b8a9c14'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Tables that used to come from Base.metadata.create_all at app startup, plus
+# the raw-SQL tracking and newsletter tables that no model describes. Every
+# statement is IF NOT EXISTS so existing databases are left as they are.
+# page_views has the shape the tracking code writes, not the unused PageView model.
+STATEMENTS = [
+    """DO $$ BEGIN
+        CREATE TYPE application_status AS ENUM ('New', 'Reviewed', 'Interview', 'Hired', 'Rejected');
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END $$""",
+    """CREATE TABLE IF NOT EXISTS admins (
+        id SERIAL PRIMARY KEY,
+        email VARCHAR(255) NOT NULL,
+        password_hash VARCHAR(255) NOT NULL,
+        name VARCHAR(255) NOT NULL,
+        phone VARCHAR(50),
+        role VARCHAR(50) NOT NULL,
+        profile_image_url VARCHAR(500),
+        is_active BOOLEAN,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        updated_at TIMESTAMP WITHOUT TIME ZONE
+    )""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_admins_email ON admins (email)",
+    "CREATE INDEX IF NOT EXISTS ix_admins_id ON admins (id)",
+    """CREATE TABLE IF NOT EXISTS jobs (
+        id SERIAL PRIMARY KEY,
+        title VARCHAR(255) NOT NULL,
+        category VARCHAR(100) NOT NULL,
+        job_type VARCHAR(50) NOT NULL,
+        location VARCHAR(255) NOT NULL,
+        salary VARCHAR(100),
+        summary TEXT,
+        description TEXT,
+        requirements TEXT,
+        qualifications TEXT,
+        skills TEXT,
+        certifications TEXT,
+        working_hours TEXT,
+        experience VARCHAR(255),
+        benefits TEXT,
+        training TEXT,
+        tags TEXT,
+        start_date VARCHAR(100),
+        application_deadline TIMESTAMP WITHOUT TIME ZONE,
+        is_active BOOLEAN,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        updated_at TIMESTAMP WITHOUT TIME ZONE
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_id ON jobs (id)",
+    """CREATE TABLE IF NOT EXISTS applications (
+        id SERIAL PRIMARY KEY,
+        job_id INTEGER NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+        name VARCHAR(255) NOT NULL,
+        email VARCHAR(255) NOT NULL,
+        phone VARCHAR(50),
+        experience VARCHAR(255),
+        availability VARCHAR(255),
+        cv_url VARCHAR(500),
+        status application_status NOT NULL,
+        notes TEXT,
+        applied_at TIMESTAMP WITHOUT TIME ZONE,
+        updated_at TIMESTAMP WITHOUT TIME ZONE
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_applications_id ON applications (id)",
+    "CREATE INDEX IF NOT EXISTS ix_applications_job_id ON applications (job_id)",
+    "CREATE INDEX IF NOT EXISTS ix_applications_email ON applications (email)",
+    """CREATE TABLE IF NOT EXISTS analytics_snapshots (
+        id SERIAL PRIMARY KEY,
+        snapshot_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        visitors INTEGER,
+        page_views INTEGER,
+        bounce_rate FLOAT,
+        avg_duration_seconds INTEGER,
+        source_direct FLOAT,
+        source_google FLOAT,
+        source_social FLOAT,
+        source_referral FLOAT,
+        device_desktop FLOAT,
+        device_mobile FLOAT,
+        device_tablet FLOAT
+    )""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_analytics_snapshots_snapshot_date ON analytics_snapshots (snapshot_date)",
+    "CREATE INDEX IF NOT EXISTS ix_analytics_snapshots_id ON analytics_snapshots (id)",
+    """CREATE TABLE IF NOT EXISTS notification_preferences (
+        id SERIAL PRIMARY KEY,
+        admin_id INTEGER NOT NULL UNIQUE REFERENCES admins (id) ON DELETE CASCADE,
+        email_new_application BOOLEAN,
+        email_new_message BOOLEAN,
+        email_weekly_report BOOLEAN,
+        email_monthly_report BOOLEAN,
+        push_new_application BOOLEAN,
+        push_new_message BOOLEAN,
+        updated_at TIMESTAMP WITHOUT TIME ZONE
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_notification_preferences_id ON notification_preferences (id)",
+    """CREATE TABLE IF NOT EXISTS system_settings (
+        id SERIAL PRIMARY KEY,
+        admin_id INTEGER NOT NULL UNIQUE REFERENCES admins (id) ON DELETE CASCADE,
+        site_name VARCHAR(255) NOT NULL,
+        site_email VARCHAR(255),
+        site_phone VARCHAR(50),
+        site_address TEXT,
+        maintenance_mode BOOLEAN,
+        allow_registrations BOOLEAN,
+        social_facebook VARCHAR(500),
+        social_twitter VARCHAR(500),
+        social_linkedin VARCHAR(500),
+        social_instagram VARCHAR(500),
+        updated_at TIMESTAMP WITHOUT TIME ZONE
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_system_settings_id ON system_settings (id)",
+    """CREATE TABLE IF NOT EXISTS newsletter_subscribers (
+        id SERIAL PRIMARY KEY,
+        email VARCHAR(255) NOT NULL UNIQUE,
+        name VARCHAR(255),
+        is_active BOOLEAN DEFAULT TRUE,
+        subscribed_at TIMESTAMP WITHOUT TIME ZONE DEFAULT (now() AT TIME ZONE 'utc')
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_newsletter_subscribers_id ON newsletter_subscribers (id)",
+    """CREATE TABLE IF NOT EXISTS site_visits (
+        id SERIAL PRIMARY KEY,
+        session_id VARCHAR(255) NOT NULL UNIQUE,
+        device VARCHAR(50),
+        browser VARCHAR(50),
+        referrer VARCHAR(500),
+        landing_page VARCHAR(500),
+        duration_seconds INTEGER DEFAULT 0,
+        bounced BOOLEAN DEFAULT TRUE,
+        visited_at TIMESTAMP WITHOUT TIME ZONE DEFAULT (now() AT TIME ZONE 'utc')
+    )""",
+    """CREATE TABLE IF NOT EXISTS page_views (
+        id SERIAL PRIMARY KEY,
+        page VARCHAR(500) NOT NULL,
+        referrer VARCHAR(500),
+        device VARCHAR(50),
+        browser VARCHAR(50),
+        session_id VARCHAR(255),
+        viewed_at TIMESTAMP WITHOUT TIME ZONE DEFAULT (now() AT TIME ZONE 'utc')
+    )""",
+    """CREATE TABLE IF NOT EXISTS newsletter_uploads (
+        id SERIAL PRIMARY KEY,
+        filename VARCHAR(255) NOT NULL,
+        original_name VARCHAR(255),
+        file_type VARCHAR(50),
+        file_size INTEGER,
+        url VARCHAR(1000),
+        uploaded_at TIMESTAMP WITHOUT TIME ZONE DEFAULT (now() AT TIME ZONE 'utc')
+    )""",
+    """CREATE TABLE IF NOT EXISTS newsletter_history (
+        id SERIAL PRIMARY KEY,
+        subject VARCHAR(500),
+        message TEXT,
+        sent_to INTEGER DEFAULT 0,
+        failed INTEGER DEFAULT 0,
+        attachments TEXT,
+        sent_at TIMESTAMP WITHOUT TIME ZONE DEFAULT (now() AT TIME ZONE 'utc')
+    )""",
+]
+
+TABLES = [
+    'newsletter_history', 'newsletter_uploads', 'page_views', 'site_visits',
+    'newsletter_subscribers', 'system_settings', 'notification_preferences',
+    'analytics_snapshots', 'applications', 'jobs', 'admins',
+]
+
+
+def upgrade() -> None:
+    for statement in STATEMENTS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_table(table)
+    op.execute("DROP TYPE IF EXISTS application_status")
@@ -0,0 +1,34 @@
+"""add_list_keyset_indexes
+
+Revision ID: 4b8f2e61d3a7
+Revises: 7e1d5b9c04a2
+Create Date: 2026-10-18 10:12:08.551930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b8f2e61d3a7'
+down_revision = '7e1d5b9c04a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_applications_applied_at_id', 'applications', ['applied_at', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_applications_status_applied_at_id', 'applications', ['status', 'applied_at', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_applications_job_id_applied_at_id', 'applications', ['job_id', 'applied_at', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_contact_inquiries_created_at_id', 'contact_inquiries', ['created_at', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_contact_inquiries_status_created_at_id', 'contact_inquiries', ['status', 'created_at', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_newsletter_subscribers_subscribed_at_id', 'newsletter_subscribers', ['subscribed_at', 'id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_newsletter_subscribers_subscribed_at_id', table_name='newsletter_subscribers')
+    op.drop_index('ix_contact_inquiries_status_created_at_id', table_name='contact_inquiries')
+    op.drop_index('ix_contact_inquiries_created_at_id', table_name='contact_inquiries')
+    op.drop_index('ix_applications_job_id_applied_at_id', table_name='applications')
+    op.drop_index('ix_applications_status_applied_at_id', table_name='applications')
+    op.drop_index('ix_applications_applied_at_id', table_name='applications')
@@ -0,0 +1,27 @@
+"""add_page_rollup_session_sketches
+
+Revision ID: 7e1d5b9c04a2
+Revises: 2c3418662a6c
+Create Date: 2026-10-18 09:41:37.902114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e1d5b9c04a2'
+down_revision = '2c3418662a6c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('page_daily_rollups', sa.Column('sessions_hll', sa.LargeBinary(), nullable=True))
+    # Existing rollup days have no sketches; reset the watermark so the
+    # aggregator rebuilds them from raw page views.
+    op.execute("DELETE FROM rollup_watermarks WHERE name = 'tracking_daily'")
+
+
+def downgrade() -> None:
+    op.drop_column('page_daily_rollups', 'sessions_hll')
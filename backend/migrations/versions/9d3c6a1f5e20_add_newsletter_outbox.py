@@ -0,0 +1,58 @@
+"""add_newsletter_outbox
+
+Revision ID: 9d3c6a1f5e20
+Revises: 4b8f2e61d3a7
+Create Date: 2026-10-18 11:02:41.207315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3c6a1f5e20'
+down_revision = '4b8f2e61d3a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('newsletter_campaigns',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('subject', sa.String(length=255), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('html', sa.Text(), nullable=False),
+    sa.Column('attachments', sa.Text(), nullable=True),
+    sa.Column('attachment_info', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_newsletter_campaigns_id'), 'newsletter_campaigns', ['id'], unique=False)
+    op.create_table('newsletter_deliveries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('campaign_id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.String(length=500), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['campaign_id'], ['newsletter_campaigns.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_newsletter_deliveries_id'), 'newsletter_deliveries', ['id'], unique=False)
+    op.create_index('ix_newsletter_deliveries_campaign_id_status', 'newsletter_deliveries', ['campaign_id', 'status'], unique=False)
+    op.create_index('ix_newsletter_deliveries_status_next_attempt_at_id', 'newsletter_deliveries', ['status', 'next_attempt_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_newsletter_deliveries_status_next_attempt_at_id', table_name='newsletter_deliveries')
+    op.drop_index('ix_newsletter_deliveries_campaign_id_status', table_name='newsletter_deliveries')
+    op.drop_index(op.f('ix_newsletter_deliveries_id'), table_name='newsletter_deliveries')
+    op.drop_table('newsletter_deliveries')
+    op.drop_index(op.f('ix_newsletter_campaigns_id'), table_name='newsletter_campaigns')
+    op.drop_table('newsletter_campaigns')
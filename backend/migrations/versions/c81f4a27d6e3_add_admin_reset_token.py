@@ -0,0 +1,28 @@
+"""add_admin_reset_token
+
+Revision ID: c81f4a27d6e3
+Revises: 9d3c6a1f5e20
+Create Date: 2026-10-18 16:05:44.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81f4a27d6e3'
+down_revision = '9d3c6a1f5e20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Previously added by ALTER statements at app startup, so existing
+    # databases already have these columns.
+    op.execute("ALTER TABLE admins ADD COLUMN IF NOT EXISTS reset_token VARCHAR(255)")
+    op.execute("ALTER TABLE admins ADD COLUMN IF NOT EXISTS reset_token_expiry TIMESTAMP")
+
+
+def downgrade() -> None:
+    op.drop_column('admins', 'reset_token_expiry')
+    op.drop_column('admins', 'reset_token')
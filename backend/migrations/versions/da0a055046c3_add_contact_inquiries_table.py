@@ -1,7 +1,7 @@
 """add_contact_inquiries_table
 
 Revision ID: da0a055046c3
-Revises: 
+Revises: 3f6e2b8a9c14
 Create Date: 2026-02-02 17:11:45.848738
 
 """
@@ -11,7 +11,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision = 'da0a055046c3'
-down_revision = None
+down_revision = '3f6e2b8a9c14'
 branch_labels = None
 depends_on = None
 
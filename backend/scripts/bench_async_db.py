@@ -0,0 +1,127 @@
+"""Throughput benchmark for the tracking write routes with and without the async engine.
+
+Run from backend/ against a migrated database:
+    DATABASE_URL=postgresql://... python scripts/bench_async_db.py --concurrency 50 --seconds 10
+
+For each mode (DATABASE_ASYNC=false, then true) this starts uvicorn in a
+subprocess and keeps ``--concurrency`` clients sending PATCH
+/api/tracking/session and POST /api/tracking/batch for ``--seconds``, then
+reports requests/sec and latency percentiles. Rows are written under
+session ids prefixed "bench-" and deleted afterwards.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+SESSIONS = 200
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_ready(client: httpx.AsyncClient, server: subprocess.Popen):
+    for _ in range(200):
+        if server.poll() is not None:
+            raise SystemExit(f"uvicorn exited with code {server.returncode}")
+        try:
+            await client.get("/")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.05)
+    raise SystemExit("uvicorn did not start")
+
+
+async def load(base_url: str, server: subprocess.Popen, concurrency: int, seconds: float) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        await wait_ready(client, server)
+        await client.post("/api/tracking/batch", json=[
+            {"type": "session_start", "session_id": f"bench-{i}", "landing_page": "/"} for i in range(SESSIONS)
+        ])
+
+        latencies, errors = [], 0
+        deadline = time.perf_counter() + seconds
+
+        async def worker(n: int):
+            nonlocal errors
+            i = n
+            while time.perf_counter() < deadline:
+                session_id = f"bench-{i % SESSIONS}"
+                start = time.perf_counter()
+                if i % 2:
+                    response = await client.patch("/api/tracking/session", json={"session_id": session_id, "duration": i % 600, "bounced": False})
+                else:
+                    response = await client.post("/api/tracking/batch", json=[
+                        {"type": "page_view", "session_id": session_id, "page": "/jobs"},
+                        {"type": "session_end", "session_id": session_id, "duration": i % 600, "bounced": False},
+                    ])
+                latencies.append(time.perf_counter() - start)
+                errors += response.status_code >= 400
+                i += concurrency
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+def run_mode(async_db: bool, concurrency: int, seconds: float) -> dict:
+    port = free_port()
+    env = {**os.environ, "DATABASE_ASYNC": "true" if async_db else "false", "APP_ENV": "production"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        return asyncio.run(load(f"http://127.0.0.1:{port}", server, concurrency, seconds))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def cleanup():
+    sys.path.insert(0, str(BACKEND_DIR))
+    from sqlalchemy import text
+    from app.database import engine
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM page_views WHERE session_id LIKE 'bench-%'"))
+        conn.execute(text("DELETE FROM site_visits WHERE session_id LIKE 'bench-%'"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--mode", choices=("both", "threaded", "async"), default="both")
+    args = parser.parse_args()
+
+    modes = {"both": (False, True), "threaded": (False,), "async": (True,)}[args.mode]
+    try:
+        for async_db in modes:
+            r = run_mode(async_db, args.concurrency, args.seconds)
+            label = "asyncpg" if async_db else "threaded"
+            print(f"{label:>9}: {r['rps']:8.1f} req/s  p50 {r['p50_ms']:6.1f} ms  p99 {r['p99_ms']:6.1f} ms  errors {r['errors']}")
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
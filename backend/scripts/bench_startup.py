@@ -0,0 +1,54 @@
+"""Cold-start benchmark: time to import app.main and time until startup is done.
+
+Run from backend/:  python scripts/bench_startup.py --runs 5
+
+Each run is a fresh interpreter so nothing is already imported. "ready" is
+when the lifespan startup has finished, i.e. when uvicorn would begin
+accepting requests. Importing the app needs no database; the background
+workers started by the lifespan only connect once they have work.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+CHILD = """
+import asyncio, json, time
+start = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def main():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+    return ready
+
+ready = asyncio.run(main())
+print(json.dumps({"import_ms": (imported - start) * 1000, "ready_ms": (ready - start) * 1000}))
+"""
+
+
+def run_once() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    for key, label in (("import_ms", "import"), ("ready_ms", "import -> ready")):
+        values = [r[key] for r in runs]
+        print(f"{label:>16}: median {statistics.median(values):7.1f} ms  min {min(values):7.1f} ms  max {max(values):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
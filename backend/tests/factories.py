@@ -0,0 +1,63 @@
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import text
+
+PAGES = ["/", "/jobs", "/about", "/contact", "/services", "/jobs/1", "/jobs/2"]
+SOURCES = ["Direct", "Google Search", "Social Media", "Referral"]
+DEVICES = ["desktop", "mobile", "tablet"]
+
+
+def seed_tracking(db, days: int = 40, visits_per_day: int = 30, now: datetime = None, seed: int = 7):
+    """Insert visits and page views spread over the last ``days`` days."""
+    rng = random.Random(seed)
+    now = now or datetime.utcnow()
+    visits, views = [], []
+    for n in range(days * visits_per_day):
+        visited_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+        session_id = f"s{seed}-{n}"
+        pages = rng.sample(PAGES, rng.randint(1, 4))
+        visits.append({
+            "session_id": session_id,
+            "device": rng.choice(DEVICES),
+            "browser": "Chrome",
+            "referrer": rng.choice(SOURCES),
+            "landing_page": pages[0],
+            "duration_seconds": rng.choice([0, 0, rng.randint(5, 600)]),
+            "bounced": len(pages) == 1,
+            "visited_at": visited_at,
+        })
+        for i, page in enumerate(pages):
+            views.append({
+                "page": page, "referrer": "", "device": "desktop", "browser": "Chrome",
+                "session_id": session_id, "viewed_at": visited_at + timedelta(seconds=30 * i),
+            })
+    db.execute(text("""
+        INSERT INTO site_visits (session_id, device, browser, referrer, landing_page, duration_seconds, bounced, visited_at)
+        VALUES (:session_id, :device, :browser, :referrer, :landing_page, :duration_seconds, :bounced, :visited_at)
+    """), visits)
+    db.execute(text("""
+        INSERT INTO page_views (page, referrer, device, browser, session_id, viewed_at)
+        VALUES (:page, :referrer, :device, :browser, :session_id, :viewed_at)
+    """), views)
+    db.commit()
+
+
+def seed_applications(db, count: int, jobs: int = 5, seed: int = 7):
+    """Insert ``jobs`` jobs and ``count`` applications spread across them."""
+    from app.models import Application, Job
+    rng = random.Random(seed)
+    job_rows = [Job(title=f"Carer {seed}-{i}") for i in range(jobs)]
+    db.add_all(job_rows)
+    db.flush()
+    now = datetime.utcnow()
+    db.add_all(
+        Application(
+            job_id=rng.choice(job_rows).id,
+            name=f"Applicant {seed}-{n}",
+            email=f"applicant{seed}-{n}@example.com",
+            status=rng.choice(["New", "Reviewed", "Interview"]),
+            applied_at=now - timedelta(minutes=rng.randint(1, 60 * 24 * 30)),
+        )
+        for n in range(count)
+    )
+    db.commit()
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import text
+from app.services.analytics_queries import visit_metrics, page_view_metrics
+from app.services.query_counter import count_queries
+from app.services.rollups import roll_up, rollup_watermark
+from tests.factories import seed_tracking
+
+# The per-metric queries GET /api/analytics ran before the single-scan layer
+OLD_VISITORS = "SELECT COUNT(*) FROM site_visits WHERE visited_at >= :s"
+OLD_PAGE_VIEWS = "SELECT COUNT(*) FROM page_views WHERE viewed_at >= :s"
+OLD_AVG_DURATION = "SELECT AVG(duration_seconds) FROM site_visits WHERE visited_at >= :s AND duration_seconds > 0"
+OLD_BOUNCED = "SELECT COUNT(*) FROM site_visits WHERE visited_at >= :s AND bounced = TRUE"
+OLD_DAILY = """
+    SELECT DATE(viewed_at) as day, COUNT(*) as views
+    FROM page_views WHERE viewed_at >= :s
+    GROUP BY DATE(viewed_at) ORDER BY day
+"""
+OLD_SOURCES = """
+    SELECT referrer, COUNT(*) as count FROM site_visits
+    WHERE visited_at >= :s GROUP BY referrer ORDER BY count DESC
+"""
+OLD_DEVICES = """
+    SELECT device, COUNT(*) as count FROM site_visits
+    WHERE visited_at >= :s GROUP BY device ORDER BY count DESC
+"""
+OLD_PAGES = """
+    SELECT page, COUNT(*) as views, COUNT(DISTINCT session_id) as unique_visitors
+    FROM page_views WHERE viewed_at >= :s
+    GROUP BY page ORDER BY views DESC
+"""
+
+WINDOWS = [1, 7, 30, 3650]
+
+
+def old_metrics(db, since):
+    p = {"s": since}
+    scalar = lambda sql: db.execute(text(sql), p).scalar()
+    return {
+        "visitors": scalar(OLD_VISITORS),
+        "page_views": scalar(OLD_PAGE_VIEWS),
+        "avg_duration": float(scalar(OLD_AVG_DURATION) or 0),
+        "bounced": scalar(OLD_BOUNCED),
+        "daily": [tuple(r) for r in db.execute(text(OLD_DAILY), p)],
+        "sources": {r[0]: r[1] for r in db.execute(text(OLD_SOURCES), p)},
+        "devices": {r[0]: r[1] for r in db.execute(text(OLD_DEVICES), p)},
+        "pages": {r[0]: (r[1], r[2]) for r in db.execute(text(OLD_PAGES), p)},
+    }
+
+
+def assert_same(db, since, watermark):
+    old = old_metrics(db, since)
+    visits = visit_metrics(db, since, watermark)
+    views = page_view_metrics(db, since, watermark)
+    exact = page_view_metrics(db, since, exact=True)
+
+    assert visits.visitors == old["visitors"]
+    assert visits.bounced == old["bounced"]
+    assert visits.avg_duration == pytest.approx(old["avg_duration"])
+    assert dict(visits.sources) == old["sources"]
+    assert dict(visits.devices) == old["devices"]
+    assert [c for _, c in visits.sources] == sorted(old["sources"].values(), reverse=True)
+    assert views.page_views == old["page_views"]
+    assert views.daily == old["daily"]
+    assert dict(views.pages) == {page: v for page, (v, _) in old["pages"].items()}
+    assert {page: (v, exact.unique_visitors[page]) for page, v in exact.pages} == old["pages"]
+
+
+@pytest.mark.parametrize("days", WINDOWS)
+def test_raw_scan_matches_old_queries(db, days):
+    seed_tracking(db)
+    assert_same(db, datetime.utcnow() - timedelta(days=days), watermark=None)
+
+
+@pytest.mark.parametrize("days", WINDOWS)
+def test_rollups_match_old_queries(db, days):
+    seed_tracking(db)
+    roll_up(db)
+    watermark = rollup_watermark(db)
+    assert watermark == datetime.utcnow().date()
+    assert_same(db, datetime.utcnow() - timedelta(days=days), watermark)
+
+
+def test_one_statement_per_table(db):
+    seed_tracking(db, days=5)
+    since = datetime.utcnow() - timedelta(days=7)
+    with count_queries() as queries:
+        visit_metrics(db, since)
+        page_view_metrics(db, since)
+    assert queries.count == 2
+
+
+def test_endpoint_query_count_does_not_grow_with_data(db):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.database import get_db
+    from app.routes import analytics
+    from app.services.auth_service import get_current_admin
+    from app.services.cache import cache_backend
+
+    app = FastAPI()
+    app.include_router(analytics.router)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_admin] = lambda: None
+    client = TestClient(app)
+
+    counts = []
+    for visits_per_day in (1, 50):
+        seed_tracking(db, days=10, visits_per_day=visits_per_day, seed=visits_per_day)
+        cache_backend.clear()
+        with count_queries() as queries:
+            response = client.get("/api/analytics", params={"period": "month"})
+        assert response.status_code == 200
+        counts.append(queries.count)
+    # Was 11 before; rollup watermark, two scans, sketches/raw sessions for top pages, applications, jobs
+    assert counts[0] == counts[1] <= 7
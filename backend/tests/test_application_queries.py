@@ -0,0 +1,53 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.database import get_db
+from app.routes import analytics, applications, dashboard
+from app.services.auth_service import get_current_admin
+from app.services.cache import cache_backend
+from app.services.query_counter import count_queries
+from tests.factories import seed_applications
+
+ENDPOINTS = [
+    ("/api/applications", {}),
+    ("/api/applications", {"limit": 50}),
+    ("/api/applications", {"status_filter": "New"}),
+    ("/api/dashboard", {}),
+    ("/api/analytics/dashboard", {}),
+]
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    for module in (applications, dashboard, analytics):
+        app.include_router(module.router)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_admin] = lambda: None
+    return TestClient(app)
+
+
+def applications_in(body):
+    if isinstance(body, list):
+        return body
+    return body["recent_applications"]
+
+
+def query_count(client, path, params) -> int:
+    cache_backend.clear()
+    with count_queries() as queries:
+        response = client.get(path, params=params)
+    assert response.status_code == 200
+    assert all(item["position"].startswith("Carer") for item in applications_in(response.json()))
+    return queries.count
+
+
+@pytest.mark.parametrize("path,params", ENDPOINTS)
+def test_query_count_does_not_grow_with_applications(client, db, path, params):
+    seed_applications(db, 3, seed=1)
+    few = query_count(client, path, params)
+    seed_applications(db, 300, seed=2)
+    many = query_count(client, path, params)
+    assert few == many
+    # The job title comes from the same statement as the rows
+    assert many <= 5
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from app import database
+from app.database import ThreadedSession, get_async_db
+from app.routes import tracking
+from tests.conftest import TEST_DATABASE_URL
+
+MODES = ["threaded", "asyncpg"]
+
+
+@pytest.fixture(params=MODES)
+def mode(request, db, monkeypatch):
+    """Run the test once on the worker-thread session and once on asyncpg."""
+    if request.param == "asyncpg":
+        pytest.importorskip("asyncpg")
+        # No pool, so connections never outlive the event loop that opened them
+        engine = create_async_engine(TEST_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"), poolclass=NullPool)
+        monkeypatch.setattr(database, "AsyncSessionLocal", async_sessionmaker(engine, autoflush=False, expire_on_commit=False))
+    else:
+        monkeypatch.setattr(database, "AsyncSessionLocal", None)
+    return request.param
+
+
+@pytest.fixture
+def client(mode):
+    app = FastAPI()
+    app.include_router(tracking.router)
+    return TestClient(app)
+
+
+def test_get_async_db_yields_session_for_mode(mode):
+    async def scenario():
+        async for db in get_async_db():
+            return type(db), (await db.execute(text("SELECT 1"))).scalar()
+
+    session_type, one = asyncio.run(scenario())
+    assert session_type is (AsyncSession if mode == "asyncpg" else ThreadedSession)
+    assert one == 1
+
+
+def test_tracking_writes_through_async_db(client, db):
+    response = client.post("/api/tracking/batch", json=[
+        {"type": "session_start", "session_id": "s1", "referrer": "https://www.google.com/", "landing_page": "/"},
+        {"type": "page_view", "session_id": "s1", "page": "/"},
+        {"type": "page_view", "session_id": "s1", "page": "/jobs"},
+        {"type": "session_end", "session_id": "s1", "duration": 40, "bounced": False},
+    ])
+    assert response.json() == {"ok": True, "accepted": 4}
+    assert db.execute(text("SELECT COUNT(*) FROM page_views WHERE session_id = 's1'")).scalar() == 2
+    visit = db.execute(text("SELECT referrer, duration_seconds, bounced FROM site_visits WHERE session_id = 's1'")).one()
+    assert tuple(visit) == ("Google Search", 40, False)
+
+    assert client.patch("/api/tracking/session", json={"session_id": "s1", "duration": 75, "bounced": False}).json() == {"ok": True}
+    assert client.post("/api/tracking/session-end", json={"session_id": "s1", "duration": 90, "bounced": True}).json() == {"ok": True}
+    db.rollback()
+    visit = db.execute(text("SELECT duration_seconds, bounced FROM site_visits WHERE session_id = 's1'")).one()
+    assert tuple(visit) == (90, True)
+
+
+def test_failed_batch_writes_nothing(client, db):
+    # The page column is VARCHAR(500), so the page view insert fails and the batch rolls back
+    with pytest.raises(Exception, match="too long"):
+        client.post("/api/tracking/batch", json=[
+            {"type": "session_start", "session_id": "s2", "landing_page": "/"},
+            {"type": "page_view", "session_id": "s2", "page": "/" + "x" * 600},
+        ])
+    assert db.execute(text("SELECT COUNT(*) FROM site_visits WHERE session_id = 's2'")).scalar() == 0
+
+
+def test_session_start_without_landing_page(client, db):
+    client.post("/api/tracking/batch", json=[
+        {"type": "session_start", "session_id": "bare"},
+        {"type": "session_start", "session_id": "viewed"},
+        {"type": "page_view", "session_id": "viewed", "page": "/jobs"},
+    ])
+    landing = dict(db.execute(text("SELECT session_id, landing_page FROM site_visits")).all())
+    # NULL rather than "", so the visit is not attributed to an empty page
+    assert landing == {"bare": None, "viewed": "/jobs"}
+
+
+def test_oversized_batch_is_rejected_before_parsing(client, db, monkeypatch):
+    parsed = []
+    monkeypatch.setattr(tracking.batch_adapter, "validate_json", parsed.append, raising=False)
+    monkeypatch.setattr(tracking, "MAX_BATCH_BYTES", 1024)
+    events = b",".join(b'{"type":"page_view","session_id":"big","page":"/"}' for _ in range(100))
+
+    assert client.post("/api/tracking/batch", content=b"[" + events + b"]").status_code == 413
+    # Without a Content-Length the body is counted as it streams in
+    chunks = iter([b"["] + [events] + [b"]"])
+    assert client.post("/api/tracking/batch", content=chunks).status_code == 413
+    assert parsed == []
@@ -0,0 +1,91 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.database import get_db
+from app.models import Admin
+from app.routes import auth
+from app.services.auth_service import get_password_hash
+from app.services.password_hashing import hash_executor
+from app.services.rate_limit import SlidingWindowLimiter
+
+PASSWORD = "correct-horse"
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    monkeypatch.setattr(auth, "ip_limiter", SlidingWindowLimiter(3, 60))
+    monkeypatch.setattr(auth, "email_limiter", SlidingWindowLimiter(2, 60))
+    db.add(Admin(email="admin@example.com", password_hash=get_password_hash(PASSWORD), name="Admin", role="super-admin"))
+    db.commit()
+    app = FastAPI()
+    app.include_router(auth.router)
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+def login(client, email="admin@example.com", password="wrong-password", ip="203.0.113.1"):
+    return client.post(
+        "/api/auth/login",
+        json={"email": email, "password": password},
+        headers={"X-Forwarded-For": ip},
+    )
+
+
+def test_email_limit_rejects_before_hashing(client):
+    assert login(client).status_code == 401
+    assert login(client).status_code == 401
+    hashed = hash_executor.completed
+    response = login(client)
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) > 0
+    assert hash_executor.completed == hashed
+
+
+def test_ip_limit_is_per_forwarded_client(client):
+    for n in range(3):
+        assert login(client, email=f"user{n}@example.com", ip="198.51.100.7").status_code == 401
+    assert login(client, email="user9@example.com", ip="198.51.100.7").status_code == 429
+    # A client cannot pick its own bucket by prepending to X-Forwarded-For
+    assert login(client, email="user9@example.com", ip="10.0.0.1, 198.51.100.7").status_code == 429
+    assert login(client, email="user8@example.com", ip="198.51.100.8").status_code == 401
+
+
+def test_successful_login_and_password_change(client):
+    response = login(client, password=PASSWORD)
+    assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}", "X-Forwarded-For": "203.0.113.1"}
+    response = client.post(
+        "/api/auth/change-password",
+        json={"current_password": PASSWORD, "new_password": "new-password"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert login(client, password="new-password", ip="203.0.113.2").status_code == 200
+
+
+def test_cancelled_waiters_leave_the_queue():
+    import asyncio
+    import threading
+    from app.services.password_hashing import HashExecutor
+
+    executor = HashExecutor(workers=1, max_queue=3)
+    release = threading.Event()
+
+    async def scenario():
+        busy = asyncio.ensure_future(executor.run(release.wait))
+        waiters = [asyncio.ensure_future(executor.run(lambda: None)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        assert executor.stats()["queue_depth"] == 3
+        # Clients disconnect while their calls are still queued
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        depth = executor.stats()["queue_depth"]
+        release.set()
+        await busy
+        # The queue is usable again rather than stuck at max_queue
+        await executor.run(lambda: None)
+        return depth
+
+    assert asyncio.run(scenario()) == 0
+    assert executor.stats()["queue_depth"] == 0
@@ -0,0 +1,28 @@
+import pytest
+from app.services.cache import CacheBackend, LRUCacheBackend
+
+
+def test_backend_must_implement_the_whole_interface():
+    class Partial(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        CacheBackend()
+    with pytest.raises(TypeError, match="clear"):
+        Partial()
+
+
+def test_lru_evicts_oldest_and_invalidates_by_namespace():
+    cache = LRUCacheBackend(max_entries=2)
+    cache.set("a:1", 1, ttl=60)
+    cache.set("a:2", 2, ttl=60)
+    cache.get("a:1")
+    cache.set("b:1", 3, ttl=60)
+    assert cache.get("a:2") is None
+    assert cache.get("a:1").value == 1
+    cache.invalidate("a")
+    assert cache.get("a:1") is None
+    assert cache.get("b:1").value == 3
+    cache.set("b:2", 4, ttl=0)
+    assert cache.get("b:2") is None
@@ -0,0 +1,81 @@
+import asyncio
+import io
+import zipfile
+import httpx
+import pytest
+from app.services import cv_export
+from app.services.cv_export import stream_cv_zip
+
+
+class Stream(httpx.AsyncByteStream):
+    def __init__(self, chunks, error=None, stall=None):
+        self.chunks = chunks
+        self.error = error
+        self.stall = stall
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+        if self.stall is not None:
+            await self.stall.wait()
+        if self.error is not None:
+            raise self.error
+
+
+def use_transport(monkeypatch, streams):
+    async def handler(request):
+        return httpx.Response(200, stream=streams[request.url.path])
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(cv_export, "get_http_client", lambda: client)
+
+
+async def collect(entries, concurrency=2):
+    return b"".join([part async for part in stream_cv_zip(entries, concurrency)])
+
+
+def test_download_that_breaks_off_is_left_out(monkeypatch):
+    use_transport(monkeypatch, {
+        "/good.pdf": Stream([b"%PDF-1.4 ", b"good"]),
+        # More than one chunk arrives before the connection drops
+        "/broken.pdf": Stream([b"%PDF-1.4 " + b"x" * 100_000], error=httpx.ReadError("connection reset")),
+        "/after.pdf": Stream([b"%PDF-1.4 after"]),
+    })
+    entries = [
+        ("Good_CV.pdf", "https://cdn.test/good.pdf"),
+        ("Broken_CV.pdf", "https://cdn.test/broken.pdf"),
+        ("After_CV.pdf", "https://cdn.test/after.pdf"),
+    ]
+    archive = zipfile.ZipFile(io.BytesIO(asyncio.run(collect(entries))))
+    assert archive.testzip() is None
+    assert archive.namelist() == ["Good_CV.pdf", "After_CV.pdf", "export_errors.txt"]
+    assert archive.read("Good_CV.pdf") == b"%PDF-1.4 good"
+    assert b"Broken_CV.pdf: ReadError" in archive.read("export_errors.txt")
+
+
+def test_client_disconnect_cancels_every_download(monkeypatch):
+    async def scenario():
+        stall = asyncio.Event()
+        use_transport(monkeypatch, {
+            "/first.pdf": Stream([b"%PDF-1.4 first"]),
+            "/slow.pdf": Stream([b"%PDF-1.4 "], stall=stall),
+            "/queued.pdf": Stream([b"%PDF-1.4 "], stall=stall),
+        })
+        entries = [
+            ("First_CV.pdf", "https://cdn.test/first.pdf"),
+            ("Slow_CV.pdf", "https://cdn.test/slow.pdf"),
+            ("Queued_CV.pdf", "https://cdn.test/queued.pdf"),
+        ]
+        stream = stream_cv_zip(entries, concurrency=2)
+        await stream.__anext__()
+        await stream.__anext__()
+        # Now waiting on the stalled download of the second file
+        waiting = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        await stream.aclose()
+        await asyncio.sleep(0)
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task() and not t.done()]
+
+    assert asyncio.run(scenario()) == []
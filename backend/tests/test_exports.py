@@ -0,0 +1,33 @@
+import csv
+import io
+import json
+from app.models import Application, Job
+from app.services.exports import export_rows
+
+FORMULAS = ['=HYPERLINK("http://evil.test","CV")', "+44 7700 900123", "-2+3", "@SUM(A1:A2)", "\t=1+1"]
+
+
+def seed(db, names):
+    job = Job(title="Carer")
+    db.add(job)
+    db.flush()
+    db.add_all(Application(job_id=job.id, name=name, email=f"a{i}@test") for i, name in enumerate(names))
+    db.commit()
+
+
+def build_query(db):
+    return db.query(Application.name, Application.experience).order_by(Application.id)
+
+
+def test_csv_cells_cannot_start_a_formula(db):
+    seed(db, FORMULAS + ["Jane Doe"])
+    rows = list(csv.reader(io.StringIO(b"".join(export_rows(build_query, "csv")).decode())))
+    assert rows[0] == ["name", "experience"]
+    assert [row[0] for row in rows[1:]] == ["'" + name for name in FORMULAS] + ["Jane Doe"]
+    assert all(row[1] == "" for row in rows[1:])
+
+
+def test_ndjson_keeps_values_as_they_are(db):
+    seed(db, FORMULAS)
+    lines = b"".join(export_rows(build_query, "ndjson")).decode().splitlines()
+    assert [json.loads(line)["name"] for line in lines] == FORMULAS
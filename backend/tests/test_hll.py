@@ -0,0 +1,51 @@
+import statistics
+import pytest
+from app.services.hll import HyperLogLog
+
+# Standard error for the default precision is 1.04 / sqrt(4096), about 1.6%
+STANDARD_ERROR = 1.04 / 64
+# Dense around 2.5 * 4096, where the old linear-counting cutover was biased by 2-3%
+CARDINALITIES = [100, 1_000, 5_000, 8_000, 9_000, 10_000, 10_500, 11_000, 12_000, 20_000, 50_000]
+TRIALS = 16
+
+
+@pytest.fixture(scope="module")
+def errors():
+    """Relative error at each cardinality for several independent streams."""
+    found = {n: [] for n in CARDINALITIES}
+    for trial in range(TRIALS):
+        sketch = HyperLogLog()
+        added = 0
+        for n in CARDINALITIES:
+            sketch.update(f"t{trial}-{i}" for i in range(added, n))
+            added = n
+            found[n].append(sketch.count() / n - 1)
+    return found
+
+
+@pytest.mark.parametrize("n", CARDINALITIES)
+def test_estimate_is_unbiased(errors, n):
+    # The mean of TRIALS estimates has a standard error of STANDARD_ERROR / sqrt(TRIALS)
+    assert abs(statistics.mean(errors[n])) < 3 * STANDARD_ERROR / TRIALS ** 0.5 + 0.005
+
+
+@pytest.mark.parametrize("n", CARDINALITIES)
+def test_every_estimate_is_within_bound(errors, n):
+    assert max(abs(e) for e in errors[n]) < 4 * STANDARD_ERROR
+
+
+def test_small_and_empty_counts():
+    sketch = HyperLogLog()
+    assert sketch.count() == 0
+    sketch.update(["a", "a", "b"])
+    assert sketch.count() == 2
+
+
+def test_merged_sketch_counts_the_union():
+    a, b = HyperLogLog(), HyperLogLog()
+    a.update(f"s{i}" for i in range(0, 6_000))
+    b.update(f"s{i}" for i in range(4_000, 10_000))
+    merged = HyperLogLog.from_bytes(a.to_bytes())
+    merged.merge_bytes(b.to_bytes())
+    assert merged.count() == pytest.approx(10_000, rel=4 * STANDARD_ERROR)
+    assert HyperLogLog.from_bytes(merged.to_bytes()).registers == merged.registers
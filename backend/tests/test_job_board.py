@@ -0,0 +1,44 @@
+import threading
+import time
+from app.services import job_board as job_board_module
+from app.services.job_board import JobBoard, JobBoardSnapshot
+
+
+def blocking_build(started: threading.Event, release: threading.Event):
+    def build(db, previous=None):
+        started.set()
+        release.wait(5)
+        return JobBoardSnapshot(body=b"[]", etag='"x"', last_modified=None, built_at=time.monotonic())
+    return build
+
+
+def test_invalidate_does_not_wait_for_a_build(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    monkeypatch.setattr(job_board_module, "build_snapshot", blocking_build(started, release))
+    board = JobBoard(max_age=60)
+    loader = threading.Thread(target=board.load)
+    loader.start()
+    assert started.wait(5)
+
+    begun = time.perf_counter()
+    board.invalidate()
+    assert time.perf_counter() - begun < 0.1
+    release.set()
+    loader.join()
+
+
+def test_invalidate_during_a_build_keeps_the_board_stale(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    monkeypatch.setattr(job_board_module, "build_snapshot", blocking_build(started, release))
+    board = JobBoard(max_age=60)
+    # A job edit's rebuild is querying when an application arrives
+    loader = threading.Thread(target=board.rebuild, args=(None,))
+    loader.start()
+    assert started.wait(5)
+    board.invalidate()
+    release.set()
+    loader.join()
+    assert board.current() is None
+
+    board.load()
+    assert board.current() is not None
@@ -0,0 +1,170 @@
+import asyncio
+import json
+from collections import namedtuple
+import httpx
+from app.services.email_delivery import RESEND_BATCH_URL, RESEND_EMAILS_URL, DeliveryEngine, EncodedMessage
+from app.services.newsletter_outbox import OutboxWorker
+
+Claimed = namedtuple("Claimed", "id campaign_id email attempts")
+
+PLAIN = {"from": "news@test", "subject": "Plain", "html": "<p>" + "news " * 200 + "</p>"}
+WITH_FILE = {"from": "news@test", "subject": "File", "html": "<p>see attached</p>",
+             "attachments": [{"filename": "a.pdf", "content": "QUJD" * 5000}]}
+
+
+class Provider:
+    """Stand-in for the email API that records every request it receives."""
+
+    def __init__(self, reject_batches=False):
+        self.requests = []
+        self.reject_batches = reject_batches
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append((str(request.url), request.content))
+        if str(request.url) == RESEND_BATCH_URL and self.reject_batches:
+            return httpx.Response(422, text="invalid recipient")
+        return httpx.Response(200, json={"id": "x"})
+
+    def sent(self, url):
+        return [body for u, body in self.requests if u == url]
+
+
+def send(provider, claimed, messages):
+    async def scenario():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(provider.handler))
+        worker = OutboxWorker(batch_size=len(claimed), poll_interval=1)
+        worker._engine = DeliveryEngine("key", rate_per_second=10_000, max_retries=0, client=client)
+        try:
+            return await worker._send(claimed, messages)
+        finally:
+            await client.aclose()
+    return asyncio.run(scenario())
+
+
+def test_batchable_campaign_goes_out_in_batch_calls():
+    claimed = [Claimed(i, 1, f"user{i}@test", 0) for i in range(250)]
+    claimed += [Claimed(1000 + i, 2, f"file{i}@test", 0) for i in range(3)]
+    provider = Provider()
+
+    results = send(provider, claimed, {1: EncodedMessage(PLAIN), 2: EncodedMessage(WITH_FILE)})
+
+    assert [r.recipient for r in results] == [row.email for row in claimed]
+    assert all(r.ok for r in results)
+    # 250 plain recipients in batches of 100, attachments one request each
+    batches = provider.sent(RESEND_BATCH_URL)
+    singles = provider.sent(RESEND_EMAILS_URL)
+    assert [len(json.loads(body)) for body in batches] == [100, 100, 50]
+    assert len(singles) == 3
+    assert len(provider.requests) == 6
+
+    # Each recipient's copy is the shared encoding plus its own "to"
+    expected = {json.dumps({"to": [row.email], **(PLAIN if row.campaign_id == 1 else WITH_FILE)}, separators=(",", ":")).encode()
+                for row in claimed}
+    sent = [json.dumps(item, separators=(",", ":")).encode() for body in batches for item in json.loads(body)]
+    assert set(sent) | set(singles) == expected
+    overhead = len(batches) * 2 + sum(len(json.loads(body)) - 1 for body in batches)
+    assert sum(len(body) for _, body in provider.requests) == sum(map(len, expected)) + overhead
+
+
+def test_rejected_batch_is_resent_one_by_one():
+    claimed = [Claimed(i, 1, f"user{i}@test", 0) for i in range(5)]
+    provider = Provider(reject_batches=True)
+
+    results = send(provider, claimed, {1: EncodedMessage(PLAIN)})
+
+    assert len(provider.sent(RESEND_BATCH_URL)) == 1
+    assert sorted(json.loads(body)["to"][0] for body in provider.sent(RESEND_EMAILS_URL)) == sorted(r.email for r in claimed)
+    assert [r.recipient for r in results] == [row.email for row in claimed]
+    assert all(r.ok for r in results)
+
+
+def test_all_resend_traffic_shares_one_rate_limit(monkeypatch):
+    from app.services import email_delivery
+    from app.services.email_delivery import TokenBucket, resend_engine
+    from app.services.notifications import NotificationDispatcher
+
+    async def scenario():
+        provider = Provider()
+        client = httpx.AsyncClient(transport=httpx.MockTransport(provider.handler))
+        monkeypatch.setenv("RESEND_API_KEY", "key")
+        monkeypatch.setattr(email_delivery, "resend_bucket", TokenBucket(rate=50, capacity=1))
+        monkeypatch.setattr(email_delivery, "get_http_client", lambda: client)
+
+        dispatcher = NotificationDispatcher(max_queue=100, workers=3, timeout=5, max_retries=0)
+        dispatcher.start()
+        outbox = resend_engine(max_retries=0)
+        started = asyncio.get_running_loop().time()
+        for i in range(15):
+            dispatcher.send(f"admin{i}@test", "New application", "<p>hi</p>")
+        await asyncio.gather(
+            dispatcher.stop(),
+            outbox.send_all([(f"user{i}@test", {"to": [f"user{i}@test"]}) for i in range(15)]),
+        )
+        elapsed = asyncio.get_running_loop().time() - started
+        await client.aclose()
+        return len(provider.requests), elapsed
+
+    requests, elapsed = asyncio.run(scenario())
+    assert requests == 30
+    # 30 requests at 50/s from one bucket take at least 29/50 s; separate buckets would finish in ~0.3 s
+    assert elapsed >= 29 / 50 * 0.95
+
+
+def seed_campaign(db, subscribers: int):
+    from sqlalchemy import text
+    from app.services.newsletter_outbox import create_campaign
+    db.execute(text("INSERT INTO newsletter_subscribers (email, is_active) VALUES (:email, TRUE)"),
+               [{"email": f"reader{i}@test"} for i in range(subscribers)])
+    campaign = create_campaign(db, "Hello", "hi", "<p>hi</p>", [], [])
+    db.commit()
+    return campaign.id
+
+
+def test_drain_holds_no_locks_while_sending(db, monkeypatch):
+    from sqlalchemy import text
+    from app.database import engine
+    from app.services import email_delivery, newsletter_outbox
+
+    seen = {}
+
+    def handler(request):
+        # Another connection can read and lock the claimed rows mid-send
+        with engine.connect() as conn:
+            conn.execute(text("SELECT id FROM newsletter_deliveries FOR UPDATE NOWAIT")).all()
+            seen["states"] = dict(conn.execute(text("SELECT status, COUNT(*) FROM newsletter_deliveries GROUP BY status")).all())
+        return httpx.Response(200, json={"data": []})
+
+    async def scenario():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setenv("RESEND_API_KEY", "key")
+        monkeypatch.setattr(email_delivery, "get_http_client", lambda: client)
+        monkeypatch.setattr(email_delivery, "resend_bucket", email_delivery.TokenBucket(1000))
+        worker = newsletter_outbox.OutboxWorker(batch_size=10, poll_interval=1)
+        drained = [await worker.drain_once() for _ in range(3)]
+        await client.aclose()
+        return drained
+
+    campaign_id = seed_campaign(db, 15)
+    assert asyncio.run(scenario()) == [10, 5, 0]
+    assert seen["states"] == {"sent": 10, "sending": 5}
+    db.rollback()
+    progress = newsletter_outbox.campaign_progress(db, campaign_id)
+    assert (progress["status"], progress["sent"], progress["sending"]) == ("completed", 15, 0)
+
+
+def test_expired_lease_is_claimed_again(db):
+    from datetime import datetime, timedelta
+    from sqlalchemy import text
+    from app.services.newsletter_outbox import claim_deliveries
+
+    seed_campaign(db, 3)
+    first = claim_deliveries(db, 10)
+    db.commit()
+    assert len(first) == 3
+    assert claim_deliveries(db, 10) == []
+    db.commit()
+
+    # The worker holding the rows died; once the lease runs out they are due again
+    db.execute(text("UPDATE newsletter_deliveries SET next_attempt_at = :t"), {"t": datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    assert [row.email for row in claim_deliveries(db, 10)] == [row.email for row in first]
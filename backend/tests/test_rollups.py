@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from app.services.rollups import roll_up, rollup_watermark
+from app.services.tracking_ingest import UPDATE_SITE_VISITS
+
+
+def add_visit(db, session_id, visited_at):
+    db.execute(text("""
+        INSERT INTO site_visits (session_id, device, browser, referrer, landing_page, visited_at)
+        VALUES (:s, 'desktop', 'Chrome', 'Direct', '/jobs', :t)
+    """), {"s": session_id, "t": visited_at})
+    db.execute(text("""
+        INSERT INTO page_views (page, referrer, device, browser, session_id, viewed_at)
+        VALUES ('/jobs', '', 'desktop', 'Chrome', :s, :t)
+    """), {"s": session_id, "t": visited_at})
+    db.commit()
+
+
+def rolled_up(db, day):
+    visits = db.execute(text(
+        "SELECT visits, bounces, duration_sum, duration_count FROM visit_daily_rollups WHERE day = :d"
+    ), {"d": day}).one()
+    page = db.execute(text(
+        "SELECT bounces, duration_sum FROM page_daily_rollups WHERE day = :d AND page = '/jobs'"
+    ), {"d": day}).one()
+    return tuple(visits), tuple(page)
+
+
+def test_session_end_after_midnight_is_folded_into_yesterday(db):
+    today = datetime.utcnow().date()
+    yesterday = today - timedelta(days=1)
+    add_visit(db, "late", datetime(yesterday.year, yesterday.month, yesterday.day, 23, 58))
+
+    assert roll_up(db, today) == 1
+    assert rolled_up(db, yesterday) == ((1, 1, 0, 0), (1, 0))
+
+    # The session end arrives once the day has already been rolled up
+    db.execute(UPDATE_SITE_VISITS, {"d": 300, "b": False, "s": "late"})
+    db.commit()
+    assert roll_up(db, today) == 0
+    assert rollup_watermark(db) == today
+    assert rolled_up(db, yesterday) == ((1, 0, 300, 1), (0, 300))
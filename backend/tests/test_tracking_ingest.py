@@ -0,0 +1,63 @@
+import asyncio
+from sqlalchemy import text
+from app.services.tracking_ingest import PageViewEvent, TrackingIngestBuffer
+
+
+def event(n: int, page: str = "/") -> PageViewEvent:
+    return PageViewEvent(
+        page=page, referrer="", device="desktop", browser="Chrome",
+        session_id=f"s{n}", source="Direct", landing_page=page,
+    )
+
+
+def count(db, table: str) -> int:
+    return db.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+
+
+def test_stop_flushes_the_batch_being_collected(db):
+    async def scenario():
+        buffer = TrackingIngestBuffer(max_size=100, flush_interval_ms=60_000, flush_batch_size=500)
+        buffer.start()
+        for n in range(10):
+            await buffer.put(event(n))
+        await asyncio.sleep(0.05)  # let the worker pull the events into its batch
+        await buffer.stop()
+        return buffer
+
+    buffer = asyncio.run(scenario())
+    assert buffer.flushed == 10
+    assert count(db, "page_views") == 10
+    assert count(db, "site_visits") == 10
+
+
+def test_one_bad_row_does_not_lose_the_batch(db):
+    buffer = TrackingIngestBuffer(max_size=100, flush_interval_ms=10, flush_batch_size=500)
+    batch = [event(n) for n in range(20)]
+    batch[13] = event(13, page="/" + "x" * 600)  # longer than page_views.page allows
+
+    asyncio.run(buffer._flush(batch))
+    assert buffer.flushed == 19
+    assert buffer.failed == 1
+    assert count(db, "page_views") == 19
+
+
+def test_batch_is_written_in_a_statement_per_table(db):
+    from sqlalchemy import event as sa_event
+    from sqlalchemy.engine import Engine
+    from app.services.tracking_ingest import SessionEndEvent, write_tracking_batch
+
+    views = [event(n, page=f"/p{n % 7}") for n in range(500)]
+    ends = [SessionEndEvent(session_id=f"s{n}", duration=n, bounced=n % 2 == 0) for n in range(500)]
+    # EXECUTEMANY is psycopg2's cursor.executemany, one round trip per row
+    executions = []
+    listener = lambda conn, cursor, statement, params, context, executemany: executions.append(context.execute_style.name)
+    sa_event.listen(Engine, "before_cursor_execute", listener)
+    try:
+        write_tracking_batch(db, views, session_ends=ends)
+    finally:
+        sa_event.remove(Engine, "before_cursor_execute", listener)
+    db.commit()
+    # One multi-row INSERT per table and one UPDATE
+    assert executions == ["INSERTMANYVALUES", "INSERTMANYVALUES", "EXECUTE"]
+    assert count(db, "page_views") == 500
+    assert db.execute(text("SELECT SUM(duration_seconds), COUNT(*) FILTER (WHERE bounced) FROM site_visits")).one() == (sum(range(500)), 250)